@@ -0,0 +1,42 @@
+import os
+import pygame as pg
+from settings import *
+
+# Searched in order: the output of build_assets.py, then the source assets
+ASSET_DIRS = (OPTIMIZED_ASSET_DIR, SOURCE_ASSET_DIR)
+
+def asset_path(*parts):
+    """Path of an asset, preferring the pre-built optimized copy when there is one"""
+    for base in ASSET_DIRS:
+        path = os.path.join(base, *parts)
+        if os.path.exists(path):
+            return path
+    return os.path.join(SOURCE_ASSET_DIR, *parts)
+
+def fit_size(size, bounds=(WIDTH, HEIGHT)):
+    """Largest size with the same aspect ratio as `size` that fits inside `bounds`"""
+    width, height = size
+    bounds_width, bounds_height = bounds
+    image_ratio = width / height
+    if bounds_width / bounds_height > image_ratio:
+        # Bounds are wider than the image - fit to height
+        return int(bounds_height * image_ratio), bounds_height
+    # Bounds are taller than the image - fit to width
+    return bounds_width, int(bounds_width / image_ratio)
+
+def load_image(name, size=None):
+    """Load an image from assets/resources, scaling it only if it is not already `size`"""
+    image = pg.image.load(asset_path("resources", name)).convert_alpha()
+    if size and image.get_size() != tuple(size):
+        image = pg.transform.scale(image, size)
+    return image
+
+def music_path(name, low_quality=False):
+    """Path of a music track in assets/music; low_quality prefers its reduced build copy"""
+    if low_quality:
+        # Under the source directory in a bundle staged by build_assets.py
+        for base in ASSET_DIRS:
+            path = os.path.join(base, "music", LOW_QUALITY_MUSIC_DIR, name)
+            if os.path.exists(path):
+                return path
+    return asset_path("music", name)
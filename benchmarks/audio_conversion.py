@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Compare peak memory and throughput of whole-file and streaming WAV conversion.
+
+Run from the repository root:
+
+    python -m benchmarks.audio_conversion --seconds 600
+"""
+import argparse
+import concurrent.futures
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import wave
+from pathlib import Path
+
+import wav2ogg
+
+def generate_wav(path, seconds, rate=44100, channels=2):
+    """
+    Write a 16-bit WAV file of noise, one second at a time.
+
+    Args:
+        path (Path): Where to write the WAV file
+        seconds (int): Length of the recording
+        rate (int): Sample rate in Hz
+        channels (int): Number of channels
+    """
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        for _ in range(seconds):
+            wav.writeframes(os.urandom(rate * channels * 2))
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    """Peak resident set size in MB of this process, or with RUSAGE_CHILDREN of its largest finished child"""
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+def measure(wav_path, output_dir, max_memory):
+    """
+    Convert a file in this (fresh) process and measure it.
+
+    Args:
+        wav_path (Path): WAV file to convert
+        output_dir (Path): Directory for the OGG file
+        max_memory (int, optional): Streaming memory ceiling in bytes, or None for whole-file
+
+    Returns:
+        tuple: (success, seconds, peak RSS of this process in MB, peak RSS of ffmpeg in MB)
+    """
+    success, seconds, size = wav2ogg.timed_convert(wav_path, output_dir, False, max_memory)
+    return success, seconds, peak_rss_mb(), peak_rss_mb(resource.RUSAGE_CHILDREN)
+
+def run_benchmark(seconds, max_memory):
+    """
+    Convert one generated recording with each path, each in a new process.
+
+    Args:
+        seconds (int): Length of the generated recording
+        max_memory (int): Streaming memory ceiling in bytes
+
+    Returns:
+        list: (name, success, seconds, throughput in MB/s, peak RSS in MB, ffmpeg peak RSS in MB) per path
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        wav_path = temp_dir / "benchmark.wav"
+        generate_wav(wav_path, seconds)
+        size_mb = wav_path.stat().st_size / 1e6
+        print(f"Generated {seconds} s recording ({size_mb:.1f} MB)")
+
+        context = multiprocessing.get_context("spawn")
+        for name, limit in (("whole file", None), ("streaming", max_memory)):
+            # A new process per path so peak RSS is not carried over
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                success, elapsed, peak, ffmpeg_peak = executor.submit(measure, wav_path, temp_dir, limit).result()
+            results.append((name, success, elapsed, size_mb / max(elapsed, 1e-9), peak, ffmpeg_peak))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark whole-file against streaming WAV conversion")
+    parser.add_argument("--seconds", type=int, default=300,
+                      help="Length of the generated recording")
+    parser.add_argument("-m", "--max-memory", type=float,
+                      default=wav2ogg.STREAM_MEMORY_LIMIT / 1024 / 1024,
+                      help="Streaming memory ceiling in MB")
+
+    args = parser.parse_args()
+
+    results = run_benchmark(args.seconds, int(args.max_memory * 1024 * 1024))
+    # ffmpeg runs as a child of the converting process, so its memory is reported separately
+    print(f"\n{'path':<12}{'time (s)':>10}{'MB/s':>10}{'python RSS (MB)':>17}{'ffmpeg RSS (MB)':>17}")
+    for name, success, elapsed, throughput, peak, ffmpeg_peak in results:
+        status = "" if success else "  (failed)"
+        print(f"{name:<12}{elapsed:>10.2f}{throughput:>10.1f}{peak:>17.1f}{ffmpeg_peak:>17.1f}{status}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""Time the game's hot paths headlessly and check them against a baseline.
+
+Run from the repository root:
+
+    python -m benchmarks.hot_paths --save-baseline     # record a baseline
+    python -m benchmarks.hot_paths                     # compare against it
+
+Exits with status 1 when any result's median is slower than the baseline's
+by more than the threshold.
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import pygame as pg
+
+from settings import *
+from grid import Grid
+import run_locally
+
+BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+DEFAULT_SIZES = "20x16,100x100,300x300"
+DEFAULT_DENSITIES = "0,0.05"
+# Difficulty whose settings (houses, resources) the benchmark levels use
+BENCHMARK_DIFFICULTY = 2
+
+def time_calls(function, repeat, setup=None):
+    """
+    Time a function call several times.
+
+    Args:
+        function (callable): Function to time
+        repeat (int): Number of timed calls
+        setup (callable, optional): Untimed function run before each call
+
+    Returns:
+        list: Seconds taken by each call
+    """
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return times
+
+def start_game():
+    """Create a Game and run its startup loader to completion"""
+    game = run_locally.Game()
+    while game.state == LOADING:
+        game.draw()
+        game.update()
+    return game
+
+def start_level(game, size, density, seed):
+    """
+    Start a level of a given size and cover a fraction of its tiles with infrastructure.
+
+    Args:
+        game (Game): Game to start the level in
+        size (tuple): Grid (width, height)
+        density (float): Fraction of tiles to build on
+        seed (int): Seed for the map and the infrastructure layout
+    """
+    config = DIFFICULTY_LEVELS[BENCHMARK_DIFFICULTY]
+    DIFFICULTY_LEVELS[BENCHMARK_DIFFICULTY] = dict(config, grid_size=size)
+    try:
+        game.new(BENCHMARK_DIFFICULTY, seed=seed)
+    finally:
+        DIFFICULTY_LEVELS[BENCHMARK_DIFFICULTY] = config
+
+    # Barriers on river banks, trees on land
+    grid = game.grid
+    layout = random.Random(seed)
+    width, height = size
+    for _ in range(int(density * width * height)):
+        tile = grid.get_tile(layout.randrange(width), layout.randrange(height))
+        if tile.has_infrastructure or tile.is_house or tile.tile_type == WATER:
+            continue
+        grid.place_infrastructure(tile, BARRIER if tile.tile_type == RIVER_BANK else VEGETATION)
+    grid.journal.clear()
+
+def benchmark_level(game, size, density, repeat, seed):
+    """
+    Time every hot path for one grid size and infrastructure density.
+
+    Args:
+        game (Game): Game to run the benchmarks in
+        size (tuple): Grid (width, height)
+        density (float): Fraction of tiles with infrastructure
+        repeat (int): Number of timed calls per benchmark
+        seed (int): Map seed
+
+    Returns:
+        dict: Benchmark name -> list of seconds, or an error message
+    """
+    width, height = size
+    house_count = DIFFICULTY_LEVELS[BENCHMARK_DIFFICULTY]['house_count']
+    grids = []
+
+    def new_grid():
+        grids.append(Grid(game, width, height, seed=seed))
+
+    def release_grids():
+        while grids:
+            grids.pop().release()
+
+    results = {}
+    # Grid construction and house placement use throwaway grids
+    results["grid_init"] = time_calls(new_grid, repeat, setup=release_grids)
+    results["place_houses"] = time_calls(lambda: grids[-1].place_houses(house_count), repeat,
+                                         setup=lambda: (release_grids(), new_grid()))
+    release_grids()
+
+    start_level(game, size, density, seed)
+    water_sim = game.water_sim
+    results["process_flooding"] = time_calls(water_sim.process_flooding, repeat,
+                                             setup=water_sim.reset_all_flooding)
+    water_sim.reset_all_flooding()
+
+    try:
+        results["update_water_flow"] = time_calls(game.grid.update_water_flow, repeat)
+    except Exception as e:
+        results["update_water_flow"] = f"{type(e).__name__}: {e}"
+
+    visible = [tile for tile, rect in game.grid.visible_tiles()]
+    results["update_appearance"] = time_calls(
+        lambda: [tile.update_appearance() for tile in visible], repeat)
+    results["draw"] = time_calls(game.draw, repeat)
+    return results
+
+def run_benchmarks(sizes, densities, repeat, seed):
+    """
+    Run every benchmark for each grid size and density.
+
+    Args:
+        sizes (list): Grid (width, height) tuples
+        densities (list): Infrastructure densities
+        repeat (int): Number of timed calls per benchmark
+        seed (int): Map seed
+
+    Returns:
+        dict: Result key -> {"median_ms", "min_ms"} or {"error"}
+    """
+    game = start_game()
+    results = {}
+    for size in sizes:
+        for density in densities:
+            level = benchmark_level(game, size, density, repeat, seed)
+            for name, times in level.items():
+                key = f"{name}/{size[0]}x{size[1]}/{density:g}"
+                if isinstance(times, str):
+                    results[key] = {"error": times}
+                else:
+                    results[key] = {
+                        "median_ms": 1000 * statistics.median(times),
+                        "min_ms": 1000 * min(times),
+                    }
+                print(f"{key:<40}" + (f"{results[key]['median_ms']:>10.2f} ms"
+                                      if "median_ms" in results[key] else f"  {times}"))
+    pg.quit()
+    return results
+
+def find_regressions(results, baseline, threshold, min_delta_ms=0.0):
+    """
+    Compare results with a baseline.
+
+    Args:
+        results (dict): Results from run_benchmarks
+        baseline (dict): Earlier results from run_benchmarks
+        threshold (float): Allowed slowdown, as a fraction of the baseline median
+        min_delta_ms (float): Slowdowns smaller than this are timer noise, not regressions
+
+    Returns:
+        list: (key, baseline median, new median) for each regressed result
+    """
+    regressions = []
+    for key, result in results.items():
+        old = baseline.get(key, {})
+        if "median_ms" in result and "median_ms" in old:
+            slower = result["median_ms"] - old["median_ms"]
+            if result["median_ms"] > old["median_ms"] * (1 + threshold) and slower > min_delta_ms:
+                regressions.append((key, old["median_ms"], result["median_ms"]))
+    return regressions
+
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game's hot paths headlessly")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                      help="Comma-separated grid sizes, e.g. 20x16,100x100")
+    parser.add_argument("--densities", default=DEFAULT_DENSITIES,
+                      help="Comma-separated fractions of tiles with infrastructure")
+    parser.add_argument("-r", "--repeat", type=int, default=5,
+                      help="Timed calls per benchmark")
+    parser.add_argument("--seed", type=int, default=1,
+                      help="Map seed")
+    parser.add_argument("-o", "--output",
+                      help="Write the results to this JSON file")
+    parser.add_argument("-b", "--baseline", default=BASELINE_PATH,
+                      help="Baseline JSON file to compare against")
+    parser.add_argument("-t", "--threshold", type=float, default=0.2,
+                      help="Allowed slowdown before failing, as a fraction (0.2 = 20%%)")
+    parser.add_argument("--min-delta", type=float, default=0.5,
+                      help="Ignore slowdowns of fewer milliseconds than this")
+    parser.add_argument("--save-baseline", action="store_true",
+                      help="Write the results to the baseline file instead of comparing")
+
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    densities = [float(density) for density in args.densities.split(",")]
+    results = run_benchmarks(sizes, densities, args.repeat, args.seed)
+    report = {
+        "python": platform.python_version(),
+        "pygame": pg.version.ver,
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nSaved baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    regressions = find_regressions(results, baseline, args.threshold, args.min_delta)
+    for key, old, new in regressions:
+        print(f"REGRESSION {key}: {old:.2f} ms -> {new:.2f} ms")
+    if regressions:
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.threshold:.0%} of {args.baseline}")
+
+if __name__ == "__main__":
+    main()
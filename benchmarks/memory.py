@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Report the Python heap used per grid cell, measured with tracemalloc.
+
+Run from the repository root:
+
+    python -m benchmarks.memory --sizes 64,128,256
+
+Surfaces are allocated by SDL, outside the Python heap, so tile images
+do not show up here; only the cell objects and their attributes do.
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import gc
+import tracemalloc
+import pygame as pg
+
+from settings import *
+from grid import Grid
+from simulation import WaterSimulation
+from benchmarks.hot_paths import start_game
+
+def traced():
+    """Bytes currently allocated on the Python heap"""
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+def measure_cells(game, size, seed):
+    """
+    Measure the heap bytes per cell of a square region of the grid.
+
+    Args:
+        game (Game): Game whose pools create the tiles
+        size (int): Side of the region, in tiles
+        seed (int): Map seed
+
+    Returns:
+        tuple: (bytes per compact cell, per materialized cell, per flooded cell)
+    """
+    game.tile_pool.free.clear()  # Measure new tiles, not recycled ones
+    grid = Grid(game, size, size, seed=seed)
+    game.grid = grid
+    cells = size * size
+    chunks = grid.chunks
+    chunks.max_materialized = None  # Keep the whole region materialized
+
+    start = traced()
+    for chunk_y in range(0, size, chunks.chunk_size):
+        for chunk_x in range(0, size, chunks.chunk_size):
+            chunks.load((chunk_x // chunks.chunk_size, chunk_y // chunks.chunk_size))
+    compact = traced()
+
+    tiles = [grid.get_tile(x, y) for y in range(size) for x in range(size)]
+    materialized = traced()
+
+    # Flood every land tile, as the simulation does, then drop the undo history
+    water_sim = WaterSimulation(game, grid)
+    for tile in tiles:
+        if tile.tile_type == LAND:
+            water_sim.flood_tile(tile)
+    grid.journal.clear()
+    flooded = traced()
+
+    del tiles
+    grid.release()
+    game.grid = None
+    return ((compact - start) / cells, (materialized - compact) / cells,
+            (flooded - materialized) / cells)
+
+def main():
+    parser = argparse.ArgumentParser(description="Report heap bytes per grid cell")
+    parser.add_argument("--sizes", default="64,128,256",
+                      help="Comma-separated sides of the square regions to measure")
+    parser.add_argument("--seed", type=int, default=1,
+                      help="Map seed")
+
+    args = parser.parse_args()
+
+    game = start_game()
+    tracemalloc.start()
+    print(f"{'cells':>8}{'compact B/cell':>16}{'tile B/cell':>14}{'flooded +B/cell':>17}")
+    for size in (int(size) for size in args.sizes.split(",")):
+        compact, materialized, flooded = measure_cells(game, size, args.seed)
+        print(f"{size * size:>8}{compact:>16.1f}{materialized:>14.1f}{flooded:>17.1f}")
+    tracemalloc.stop()
+    pg.quit()
+
+if __name__ == "__main__":
+    main()
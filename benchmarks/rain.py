@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Compare the per-frame cost of particle rain and pre-rendered rain sheets.
+
+Run from the repository root:
+
+    python -m benchmarks.rain --frames 300
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import statistics
+import time
+import pygame as pg
+
+from settings import *
+from weather_effects import RainEffect
+
+class RainGame:
+    """The only part of a Game that RainEffect reads"""
+    state = WEATHER
+
+def time_rain(mode, intensity, frames, surface):
+    """
+    Time a rain effect's update and draw once it has reached a steady state.
+
+    Args:
+        mode (str): "particles" or "sheet"
+        intensity (float): Rain intensity
+        frames (int): Number of timed frames
+        surface (Surface): Surface to draw on
+
+    Returns:
+        tuple: (median ms per frame, seconds spent pre-rendering)
+    """
+    start = time.perf_counter()
+    rain = RainEffect(RainGame(), mode)
+    rain.intensity = intensity
+    if mode == "sheet":
+        rain.get_sheet(intensity)
+    prepare = time.perf_counter() - start
+
+    # Let the particles fill the screen before timing
+    for _ in range(int(HEIGHT / RAIN_DROP_SPEED) + 2):
+        rain.update()
+
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        rain.update()
+        rain.draw(surface)
+        times.append(time.perf_counter() - start)
+    return 1000 * statistics.median(times), prepare
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark particle rain against rain sheets")
+    parser.add_argument("--frames", type=int, default=300,
+                      help="Timed frames per mode and intensity")
+
+    args = parser.parse_args()
+
+    pg.display.init()
+    surface = pg.display.set_mode((WIDTH, HEIGHT))
+    print(f"{'intensity':<10}{'mode':<11}{'ms/frame':>10}{'prepare ms':>12}")
+    for name, intensity in RAIN_INTENSITY_LEVELS.items():
+        for mode in ("particles", "sheet"):
+            frame_ms, prepare = time_rain(mode, intensity, args.frames, surface)
+            print(f"{name:<10}{mode:<11}{frame_ms:>10.3f}{1000 * prepare:>12.1f}")
+    pg.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from pathlib import Path
+import argparse
+import json
+import shutil
+import time
+import pygame as pg
+from settings import *
+from assets import fit_size
+from wav2ogg import file_hash
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    from pydub import AudioSegment
+except ImportError:
+    AudioSegment = None
+
+# Size each image is drawn at in the game. Every PNG under resources/ is built;
+# one without an entry here is recompressed at its source size. The unused
+# variants (land_brown.png, house_1.png, house_2.png) get the size of the
+# image they would stand in for, so they do not ship at full resolution
+IMAGE_SIZES = {
+    "land.png": (TILESIZE, TILESIZE),
+    "land_brown.png": (TILESIZE, TILESIZE),
+    "water.png": (TILESIZE, TILESIZE),
+    "river_bank.png": (TILESIZE, TILESIZE),
+    "barrier.png": (TILESIZE, TILESIZE),
+    "vegetation.png": (TILESIZE, TILESIZE),
+    "house.png": (TILESIZE - 10, TILESIZE - 10),
+    "house_1.png": (TILESIZE - 10, TILESIZE - 10),
+    "house_2.png": (TILESIZE - 10, TILESIZE - 10),
+    "start_screen.png": "fit",
+}
+
+# Top-level files a web bundle needs besides the assets
+BUNDLE_PATTERNS = ("*.py", "*.json", "*.html", "*.js", "*.png")
+
+# Target bitrates for re-encoded music; short stingers get a lower one
+MUSIC_BITRATE = "96k"
+STINGER_BITRATE = "64k"
+STINGER_PREFIXES = ("victory", "game_over")
+# Reduced copies of the looping music, played when the quality governor turns music quality down
+LOW_QUALITY_BITRATE = "48k"
+LOW_QUALITY_RATE = 22050
+
+def keep_smaller(source, output):
+    """
+    Replace the output with a copy of the source if re-encoding made it larger.
+
+    Args:
+        source (Path): Original asset
+        output (Path): Optimized asset
+    """
+    if output.stat().st_size > source.stat().st_size and output.suffix == source.suffix:
+        output.write_bytes(source.read_bytes())
+
+def optimize_image(source, output, size):
+    """
+    Scale an image to its runtime size and save it as a recompressed PNG.
+
+    Args:
+        source (Path): Source PNG
+        output (Path): Where to write the optimized PNG
+        size (tuple or str): Runtime size, or "fit" to fit the screen
+    """
+    image = pg.image.load(str(source))
+    if size == "fit":
+        size = fit_size(image.get_size())
+    scaled = size and image.get_size() != tuple(size)
+    if scaled:
+        image = pg.transform.smoothscale(image.convert_alpha(), size)
+
+    if Image is not None:
+        # Pillow's optimizer compresses noticeably better than SDL's PNG writer
+        data = pg.image.tobytes(image, "RGBA")
+        Image.frombytes("RGBA", image.get_size(), data).save(output, optimize=True)
+    else:
+        pg.image.save(image, str(output))
+    if not scaled:
+        keep_smaller(source, output)
+    elif output.stat().st_size > source.stat().st_size:
+        # Kept anyway: a pre-scaled image needs no scaling when it is loaded
+        print(f"Warning: scaled {output.name} is larger than its source"
+              f"{'' if Image else ' (install Pillow to compress it better)'}")
+
+def optimize_music(source, output):
+    """
+    Re-encode an OGG track at its target bitrate.
+
+    Args:
+        source (Path): Source OGG
+        output (Path): Where to write the re-encoded OGG
+    """
+    stinger = source.stem.startswith(STINGER_PREFIXES)
+    bitrate = STINGER_BITRATE if stinger else MUSIC_BITRATE
+    audio = AudioSegment.from_ogg(str(source))
+    audio.export(str(output), format="ogg", bitrate=bitrate)
+    keep_smaller(source, output)
+
+def optimize_low_quality_music(source, output):
+    """
+    Write a mono, low sample rate copy of a track that is cheaper to decode.
+
+    Args:
+        source (Path): Source OGG
+        output (Path): Where to write the reduced OGG
+    """
+    audio = AudioSegment.from_ogg(str(source)).set_channels(1).set_frame_rate(LOW_QUALITY_RATE)
+    audio.export(str(output), format="ogg", bitrate=LOW_QUALITY_BITRATE)
+
+def build_assets(source_dir=SOURCE_ASSET_DIR, output_dir=OPTIMIZED_ASSET_DIR):
+    """
+    Write optimized copies of the game's images and music plus a manifest.
+
+    Every image is built, pre-scaled to the size the game draws it at when
+    that is known, so loading it needs no scaling. Music is only re-encoded when pydub is available,
+    which also adds low quality copies of the looping tracks under
+    music/low/; otherwise it is copied unchanged. The manifest lists every output with
+    its SHA-256, its byte size and the byte size of its source.
+
+    Args:
+        source_dir (str): Directory holding resources/ and music/
+        output_dir (str): Directory to write the optimized assets to
+
+    Returns:
+        dict: The manifest
+    """
+    source_dir = Path(source_dir)
+    output_dir = Path(output_dir)
+    pg.display.init()
+    pg.display.set_mode((1, 1))
+
+    if Image is None:
+        print("Pillow not installed: PNGs are saved without extra compression, "
+              "so some scaled images come out larger than their sources")
+    if AudioSegment is None:
+        print("pydub not installed: music is copied without re-encoding")
+
+    # (source, output, optimizer), relative to the asset directories
+    jobs = [(f"resources/{image.name}", f"resources/{image.name}",
+             lambda src, out, size=IMAGE_SIZES.get(image.name): optimize_image(src, out, size))
+            for image in sorted((source_dir / "resources").glob("*.png"))]
+    for track in sorted((source_dir / "music").glob("*.ogg")):
+        jobs.append((f"music/{track.name}", f"music/{track.name}",
+                     optimize_music if AudioSegment else None))
+        if AudioSegment and not track.stem.startswith(STINGER_PREFIXES):
+            jobs.append((f"music/{track.name}", f"music/{LOW_QUALITY_MUSIC_DIR}/{track.name}",
+                         optimize_low_quality_music))
+
+    manifest = {}
+    start_time = time.time()
+    for source_name, name, optimize in jobs:
+        source = source_dir / source_name
+        output = output_dir / name
+        output.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            if optimize:
+                optimize(source, output)
+            else:
+                output.write_bytes(source.read_bytes())
+        except Exception as e:
+            print(f"Error optimizing {name}: {str(e)}")
+            output.write_bytes(source.read_bytes())
+
+        entry = {
+            "sha256": file_hash(output),
+            "bytes": output.stat().st_size,
+            "source_bytes": source.stat().st_size,
+        }
+        manifest[name] = entry
+        print(f"{name}: {entry['source_bytes']} -> {entry['bytes']} bytes")
+
+    with open(output_dir / "manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    total_source = sum(entry["source_bytes"] for entry in manifest.values())
+    total = sum(entry["bytes"] for entry in manifest.values())
+    elapsed_time = time.time() - start_time
+    print(f"\nBuilt {len(manifest)} assets in {elapsed_time:.2f} seconds: {total_source} -> {total} bytes")
+    pg.display.quit()
+    return manifest
+
+def stage_bundle(bundle_dir, output_dir=OPTIMIZED_ASSET_DIR, project_dir="."):
+    """
+    Copy the game with its optimized assets in place of the source ones, for pygbag.
+
+    The staged directory holds a single asset tree, so a web bundle built
+    from it does not ship the source assets next to their optimized copies.
+
+    Args:
+        bundle_dir (str): Directory to stage the game in; replaced if it exists
+        output_dir (str): Directory build_assets() wrote the optimized assets to
+        project_dir (str): Directory holding the game's code
+    """
+    bundle_dir = Path(bundle_dir)
+    project_dir = Path(project_dir)
+    if bundle_dir.exists():
+        shutil.rmtree(bundle_dir)
+    bundle_dir.mkdir(parents=True)
+    for pattern in BUNDLE_PATTERNS:
+        for path in project_dir.glob(pattern):
+            shutil.copy2(path, bundle_dir / path.name)
+    shutil.copytree(output_dir, bundle_dir / SOURCE_ASSET_DIR,
+                    ignore=shutil.ignore_patterns("manifest.json"))
+    print(f"Staged the game for pygbag in {bundle_dir}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-scale and recompress the game's assets")
+    parser.add_argument("-s", "--source-dir", default=SOURCE_ASSET_DIR,
+                      help="Directory holding the source resources/ and music/")
+    parser.add_argument("-o", "--output-dir", default=OPTIMIZED_ASSET_DIR,
+                      help="Directory to write the optimized assets to")
+    parser.add_argument("-b", "--bundle",
+                      help="Also stage the game with only the optimized assets here, to package with pygbag")
+
+    args = parser.parse_args()
+
+    build_assets(args.source_dir, args.output_dir)
+    if args.bundle:
+        stage_bundle(args.bundle, args.output_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import pygame as pg
+from settings import *
+
+class Camera:
+    """Scrollable, zoomable view onto the grid.
+
+    The camera position is kept in world pixels (unzoomed, TILESIZE per tile);
+    tiles are drawn at `tile_size` screen pixels each, so everything the view
+    needs is derived from the position, the zoom and the screen size.
+    """
+    def __init__(self, grid_width, grid_height, view_width=WIDTH, view_height=HEIGHT):
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.view_width = view_width
+        self.view_height = view_height
+        self.x = 0.0
+        self.y = 0.0
+        self.zoom = 1.0
+        self.tile_size = TILESIZE
+
+    @property
+    def origin(self):
+        """Screen-pixel offset of the top-left corner of the view at the current zoom"""
+        return int(self.x * self.zoom), int(self.y * self.zoom)
+
+    def grid_to_screen(self, grid_x, grid_y):
+        """Convert grid coordinates to the screen position of the tile's corner"""
+        origin_x, origin_y = self.origin
+        return (grid_x * self.tile_size - origin_x, grid_y * self.tile_size - origin_y)
+
+    def screen_to_grid(self, screen_x, screen_y):
+        """Convert a screen position to the grid coordinates under it"""
+        origin_x, origin_y = self.origin
+        return ((screen_x + origin_x) // self.tile_size, (screen_y + origin_y) // self.tile_size)
+
+    def tile_rect(self, grid_x, grid_y):
+        """Screen rectangle covered by a tile"""
+        return pg.Rect(*self.grid_to_screen(grid_x, grid_y), self.tile_size, self.tile_size)
+
+    def visible_range(self):
+        """Grid bounds (x_start, y_start, x_end, y_end) of the tiles inside the view"""
+        origin_x, origin_y = self.origin
+        x_start = max(0, origin_x // self.tile_size)
+        y_start = max(0, origin_y // self.tile_size)
+        x_end = min(self.grid_width, (origin_x + self.view_width) // self.tile_size + 1)
+        y_end = min(self.grid_height, (origin_y + self.view_height) // self.tile_size + 1)
+        return x_start, y_start, x_end, y_end
+
+    def pan(self, dx, dy):
+        """Scroll the view by a distance in screen pixels"""
+        self.x += dx / self.zoom
+        self.y += dy / self.zoom
+        self.clamp()
+
+    def zoom_at(self, factor, screen_pos):
+        """Zoom in or out keeping the world point under screen_pos in place"""
+        new_zoom = max(MIN_ZOOM, min(MAX_ZOOM, self.zoom * factor))
+        new_tile_size = max(1, round(TILESIZE * new_zoom))
+        if new_tile_size == self.tile_size:
+            return
+
+        sx, sy = screen_pos
+        world_x = self.x + sx / self.zoom
+        world_y = self.y + sy / self.zoom
+        self.zoom = new_tile_size / TILESIZE  # Keep tiles a whole number of pixels
+        self.tile_size = new_tile_size
+        self.x = world_x - sx / self.zoom
+        self.y = world_y - sy / self.zoom
+        self.clamp()
+
+    def clamp(self):
+        """Keep the view inside the map"""
+        max_x = self.grid_width * TILESIZE - self.view_width / self.zoom
+        max_y = self.grid_height * TILESIZE - self.view_height / self.zoom
+        self.x = max(0.0, min(self.x, max_x))
+        self.y = max(0.0, min(self.y, max_y))
+
+    def update(self, dt):
+        """Scroll with the arrow keys"""
+        keys = pg.key.get_pressed()
+        dx = (keys[pg.K_RIGHT] - keys[pg.K_LEFT]) * CAMERA_SCROLL_SPEED * dt
+        dy = (keys[pg.K_DOWN] - keys[pg.K_UP]) * CAMERA_SCROLL_SPEED * dt
+        if dx or dy:
+            self.pan(dx, dy)
+
+    def scale(self, sprite):
+        """Get a sprite's image at the current zoom, rescaling only when it changed"""
+        if self.tile_size == TILESIZE:
+            return sprite.image
+        if sprite.view_source is not sprite.image or sprite.view_image.get_width() != self.tile_size:
+            sprite.view_image = pg.transform.scale(sprite.image, (self.tile_size, self.tile_size))
+            sprite.view_source = sprite.image
+        return sprite.view_image
@@ -0,0 +1,245 @@
+import mmap
+import tempfile
+import threading
+from collections import OrderedDict
+from settings import *
+
+# Compact cell encoding: one state byte and one water byte per cell.
+# Tile.state uses the same state byte; bits 0-1 hold the ground type.
+TYPE_MASK = 0b11
+HOUSE_FLAG = 1 << 2
+WAS_LAND_FLAG = 1 << 3
+ORIGINAL_FLAG = 1 << 4      # Bits 5-6 hold the original type code
+ORIGINAL_SHIFT = 5
+
+class CellState:
+    """Accessors for a cell's packed `state` byte.
+
+    The type, house flag and flood history share one integer with the
+    encoding above, so a cell's state is copied to and from a chunk as-is.
+    """
+    __slots__ = ("state",)
+
+    @property
+    def tile_type(self):
+        return GROUND_TYPES[self.state & TYPE_MASK]
+
+    @tile_type.setter
+    def tile_type(self, value):
+        self.state = (self.state & ~TYPE_MASK) | value
+
+    @property
+    def is_house(self):
+        return bool(self.state & HOUSE_FLAG)
+
+    @is_house.setter
+    def is_house(self, value):
+        self.state = self.state | HOUSE_FLAG if value else self.state & ~HOUSE_FLAG
+
+    @property
+    def was_land(self):
+        """Whether the tile was land or river bank before it flooded"""
+        return bool(self.state & WAS_LAND_FLAG)
+
+    @was_land.setter
+    def was_land(self, value):
+        self.state = self.state | WAS_LAND_FLAG if value else self.state & ~WAS_LAND_FLAG
+
+    @property
+    def original_type(self):
+        """The tile's type before it first flooded, or None if it never has"""
+        if self.state & ORIGINAL_FLAG:
+            return GROUND_TYPES[(self.state >> ORIGINAL_SHIFT) & TYPE_MASK]
+        return None
+
+    @original_type.setter
+    def original_type(self, value):
+        self.state &= ~(ORIGINAL_FLAG | (TYPE_MASK << ORIGINAL_SHIFT))
+        if value is not None:
+            self.state |= ORIGINAL_FLAG | (value << ORIGINAL_SHIFT)
+
+    def flooded_state(self):
+        """The state this cell has once flooded: water that remembers what it was"""
+        state = self.state
+        if not state & ORIGINAL_FLAG:
+            state |= ORIGINAL_FLAG | ((state & TYPE_MASK) << ORIGINAL_SHIFT)
+        return (state & ~TYPE_MASK) | WAS_LAND_FLAG | WATER
+
+class ChunkStore:
+    """Grid cells split into square chunks stored as compact byte arrays.
+
+    Chunks are generated on first access, and turned into Tile objects only
+    when a tile inside them is requested. At most `max_materialized` chunks
+    keep their Tile objects; the least recently used one is written back to
+    its compact form when that limit is exceeded. With a `resident_limit`,
+    compact chunks beyond it are spilled to a memory-mapped temporary file.
+    Changes to the store are made under `lock`, so other threads can read
+    chunks with copy_chunk while the game keeps using it.
+    """
+    def __init__(self, grid, chunk_size=CHUNK_SIZE, max_materialized=MAX_MATERIALIZED_CHUNKS,
+                 resident_limit=CHUNK_RESIDENT_LIMIT):
+        self.grid = grid
+        self.chunk_size = chunk_size
+        self.cells = chunk_size * chunk_size
+        self.max_materialized = max_materialized
+        self.resident_limit = resident_limit
+        self.compact = OrderedDict()       # (cx, cy) -> bytearray, states then water levels
+        self.materialized = OrderedDict()  # (cx, cy) -> list of Tile, row-major
+        self.spilled = {}                  # (cx, cy) -> slot in the spill file
+        self.free_slots = []
+        self.spill_file = None
+        self.spill_map = None
+        self.lock = threading.RLock()
+
+    def get_tile(self, x, y):
+        """Get the tile at grid coordinates, materializing its chunk if needed"""
+        size = self.chunk_size
+        key = (x // size, y // size)
+        tiles = self.materialized.get(key)
+        if tiles is None:
+            tiles = self.materialize(key)
+        elif self.max_materialized:
+            self.materialized.move_to_end(key)
+        return tiles[(y % size) * size + x % size]
+
+    def materialize(self, key):
+        """Build the Tile objects of a chunk from its compact form"""
+        with self.lock:
+            data = self.load(key)
+            size = self.chunk_size
+            cx, cy = key
+            tiles = [None] * self.cells
+            for ly in range(min(size, self.grid.height - cy * size)):
+                for lx in range(min(size, self.grid.width - cx * size)):
+                    index = ly * size + lx
+                    tiles[index] = self.decode_tile(cx * size + lx, cy * size + ly,
+                                                    data[index], data[self.cells + index])
+
+            self.materialized[key] = tiles
+            if self.max_materialized and len(self.materialized) > self.max_materialized:
+                old_key, old_tiles = self.materialized.popitem(last=False)
+                self.evict(old_key, old_tiles)
+            return tiles
+
+    def evict(self, key, tiles):
+        """Write a chunk's tiles back to its compact form and release them"""
+        data = self.load(key)
+        for index, tile in enumerate(tiles):
+            if tile is not None:
+                data[index], data[self.cells + index] = self.encode_tile(tile)
+                self.grid.release_tile(tile)
+
+    def decode_tile(self, x, y, state, water):
+        """Create a Tile from its compact state"""
+        # Build from the original type so elevation survives flooding
+        if state & ORIGINAL_FLAG:
+            base_type = GROUND_TYPES[(state >> ORIGINAL_SHIFT) & TYPE_MASK]
+        else:
+            base_type = GROUND_TYPES[state & TYPE_MASK]
+        tile = self.grid.create_tile(x, y, base_type)
+        tile.state = state
+        tile.water_level = water / 255
+        tile.has_infrastructure = (x, y) in self.grid.infrastructure
+
+        # Plain tiles already show their type's shared image
+        if state & (ORIGINAL_FLAG | HOUSE_FLAG) or (water and tile.tile_type != WATER):
+            tile.update_appearance()
+        return tile
+
+    def encode_tile(self, tile):
+        """Pack a Tile's state into (state byte, water byte)"""
+        return tile.state, round(tile.water_level * 255)
+
+    def load(self, key):
+        """Get a chunk's compact data, generating or unspilling it if needed"""
+        with self.lock:
+            data = self.compact.get(key)
+            if data is not None:
+                self.compact.move_to_end(key)
+                return data
+
+            if key in self.spilled:
+                data = self.unspill(key)
+            else:
+                data = bytearray(2 * self.cells)
+                self.grid.generate_chunk(*key, data)
+            self.compact[key] = data
+
+            if self.resident_limit and len(self.compact) > self.resident_limit:
+                self.spill_coldest(keep=key)
+            return data
+
+    def copy_chunk(self, key):
+        """Copy a chunk's current compact data without changing the store.
+
+        Safe to call from another thread: materialized tiles are encoded
+        into the copy, and chunks never used yet are generated into it.
+        """
+        with self.lock:
+            data = self.compact.get(key)
+            if data is not None:
+                data = bytearray(data)
+            elif key in self.spilled:
+                offset = self.spilled[key] * 2 * self.cells
+                data = bytearray(self.spill_map[offset:offset + 2 * self.cells])
+            else:
+                data = bytearray(2 * self.cells)
+                self.grid.generate_chunk(*key, data)
+
+            for index, tile in enumerate(self.materialized.get(key, ())):
+                if tile is not None:
+                    data[index], data[self.cells + index] = self.encode_tile(tile)
+            return data
+
+    def spill_coldest(self, keep=None):
+        """Move the least recently used compact chunk that has no tiles, other than `keep`, to the spill file"""
+        for key in self.compact:
+            if key != keep and key not in self.materialized:
+                self.spill(key, self.compact.pop(key))
+                return
+
+    def spill(self, key, data):
+        """Write a chunk's compact data to the memory-mapped spill file"""
+        slot = self.free_slots.pop() if self.free_slots else len(self.spilled)
+        offset = slot * len(data)
+        self.ensure_spill_capacity(offset + len(data))
+        self.spill_map[offset:offset + len(data)] = data
+        self.spilled[key] = slot
+
+    def unspill(self, key):
+        """Read a chunk's compact data back from the spill file"""
+        slot = self.spilled.pop(key)
+        self.free_slots.append(slot)
+        offset = slot * 2 * self.cells
+        return bytearray(self.spill_map[offset:offset + 2 * self.cells])
+
+    def ensure_spill_capacity(self, size):
+        """Grow the spill file so it holds at least `size` bytes"""
+        current = len(self.spill_map) if self.spill_map is not None else 0
+        if size <= current:
+            return
+
+        new_size = max(size, current * 2, 64 * 2 * self.cells)
+        if self.spill_file is None:
+            self.spill_file = tempfile.TemporaryFile()
+        if self.spill_map is not None:
+            self.spill_map.close()
+        self.spill_file.truncate(new_size)
+        self.spill_map = mmap.mmap(self.spill_file.fileno(), new_size)
+
+    def materialized_tiles(self):
+        """Iterate over the Tile objects that currently exist"""
+        for tiles in self.materialized.values():
+            for tile in tiles:
+                if tile is not None:
+                    yield tile
+
+    def close(self):
+        """Release the spill file"""
+        with self.lock:
+            if self.spill_map is not None:
+                self.spill_map.close()
+                self.spill_map = None
+            if self.spill_file is not None:
+                self.spill_file.close()
+                self.spill_file = None
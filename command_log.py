@@ -0,0 +1,151 @@
+import json
+from collections import namedtuple
+from settings import *
+
+SOLUTION_VERSION = 2  # Version 1 stored infrastructure types as names
+
+# Planning actions
+PLACE = "place"
+REMOVE = "remove"
+
+# One planning action: where it happened and how it changed the budget
+Command = namedtuple("Command", "action x y infra_type resource_delta")
+
+class CommandLog:
+    """Undo/redo history of infrastructure placements and removals.
+
+    Commands store their resource delta (the full cost for placements, the
+    half refund for removals), so undoing or redoing a command is a single
+    placement or removal on the grid plus a budget adjustment. The history
+    is a list of steps, each a tuple of commands undone and redone together,
+    so a whole drag stroke is one step.
+    """
+    def __init__(self, game):
+        self.game = game
+        self.done = []
+        self.undone = []
+
+    def place(self, tile, infra_type):
+        """Build infrastructure on a tile if the budget allows it."""
+        cost = INFRASTRUCTURE_COSTS[infra_type]
+        if self.game.resources < cost:
+            return False
+        self.execute(Command(PLACE, tile.x, tile.y, infra_type, -cost))
+        return True
+
+    def remove(self, tile):
+        """Remove the infrastructure on a tile, refunding half its cost."""
+        return self.remove_all([tile]) > 0
+
+    def place_all(self, tiles, infra_type):
+        """Build on tiles, in order, while the budget lasts, as one step; returns the count built."""
+        cost = INFRASTRUCTURE_COSTS[infra_type]
+        count = min(len(tiles), self.game.resources // cost) if cost else len(tiles)
+        commands = tuple(Command(PLACE, tile.x, tile.y, infra_type, -cost) for tile in tiles[:count])
+        if commands:
+            self.execute_step(commands)
+        return len(commands)
+
+    def remove_all(self, tiles):
+        """Remove the infrastructure on tiles, refunding half of each cost, as one step."""
+        commands = []
+        for tile in tiles:
+            infra = self.game.grid.get_infrastructure(tile)
+            if infra:
+                refund = INFRASTRUCTURE_COSTS[infra.infra_type] // 2
+                commands.append(Command(REMOVE, tile.x, tile.y, infra.infra_type, refund))
+        if commands:
+            self.execute_step(tuple(commands))
+        return len(commands)
+
+    def execute(self, command):
+        """Apply a new command; this discards anything that could be redone."""
+        self.execute_step((command,))
+
+    def execute_step(self, commands):
+        """Apply new commands as one step; this discards anything that could be redone."""
+        self.apply(commands, forward=True)
+        self.done.append(commands)
+        self.undone.clear()
+
+    def undo(self):
+        """Revert the most recent step."""
+        if not self.done:
+            return False
+        step = self.done.pop()
+        self.apply(step, forward=False)
+        self.undone.append(step)
+        return True
+
+    def redo(self):
+        """Re-apply the most recently undone step."""
+        if not self.undone:
+            return False
+        step = self.undone.pop()
+        self.apply(step, forward=True)
+        self.done.append(step)
+        return True
+
+    def apply(self, step, forward):
+        """Apply a step's commands, or their inverses in reverse order when forward is False."""
+        grid = self.game.grid
+        for command in (step if forward else reversed(step)):
+            tile = grid.get_tile(command.x, command.y)
+            builds = (command.action == PLACE) == forward
+            if builds:
+                grid.place_infrastructure(tile, command.infra_type)
+            else:
+                grid.remove_infrastructure(tile)
+        # One budget change for the whole step
+        delta = sum(command.resource_delta for command in step)
+        self.game.resources += delta if forward else -delta
+
+    def clear(self):
+        """Forget the whole history."""
+        self.done.clear()
+        self.undone.clear()
+
+    def to_solution(self):
+        """Describe the current layout as a solution that can be re-applied."""
+        return {
+            "version": SOLUTION_VERSION,
+            "difficulty": self.game.current_difficulty,
+            "seed": self.game.level_seed,
+            "commands": [list(command) for step in self.done for command in step],
+        }
+
+    def save(self, path):
+        """Write the solution to a JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.to_solution(), f)
+
+def load_solution(path):
+    """Read a solution file written by CommandLog.save."""
+    with open(path) as f:
+        solution = json.load(f)
+    version = solution.get("version")
+    if version not in (1, SOLUTION_VERSION):
+        raise ValueError(f"Unsupported solution version: {version}")
+    commands = []
+    for action, x, y, infra_type, resource_delta in solution["commands"]:
+        infra_type = TileType[infra_type.upper()] if version == 1 else TileType(infra_type)
+        commands.append(Command(action, x, y, infra_type, resource_delta))
+    solution["commands"] = commands
+    return solution
+
+def apply_solution(game, path):
+    """Regenerate the solution's level and replay its commands without any input.
+
+    Each command is checked against the placement rules before it is applied,
+    so a solution that no longer fits its level raises ValueError.
+    """
+    solution = load_solution(path)
+    game.new(solution["difficulty"], seed=solution["seed"])
+    controller = game.mouse_controller
+    for command in solution["commands"]:
+        tile = game.grid.get_tile(command.x, command.y)
+        tool = command.infra_type if command.action == PLACE else "remove"
+        if not tile or not controller.can_place_infrastructure(tile, tool):
+            raise ValueError(f"Cannot {command.action} {command.infra_type} at ({command.x}, {command.y})")
+        game.command_log.execute(command)
+    return solution
@@ -2,11 +2,19 @@ import pygame as pg
 from settings import *
 vec = pg.math.Vector2
 from sprites import *
+from scheduler import ON_CHANGE, PER_FRAME
+import log
+
+logger = log.get_logger(log.CONTROLLER)
 
 class UIElement(pg.sprite.Sprite):
+    # Follows the mouse every frame
+    update_frequency = PER_FRAME
+
     def __init__(self, game, x, y, width, height, text='', color=UI_GRAY):
         self._layer = 2  # Top layer for UI
-        self.groups = game.all_sprites, game.ui_elements
+        self.groups = (game.all_sprites, game.ui_elements,
+                       *game.scheduler.group_for(self.update_frequency))
         pg.sprite.Sprite.__init__(self, self.groups)
         self.game = game
         self.image = pg.Surface((width, height))
@@ -45,8 +53,15 @@ class ToolBar:
         self.selected_tool = None
         self.create_tool_buttons()
 
+    def reset(self):
+        """Deselect every tool and put the buttons back on screen for a new level"""
+        self.selected_tool = None
+        for tool in self.tools:
+            tool.deselect()
+            tool.add(tool.groups)
+
     def select_tool(self, tool_type):
-        print(f"Selecting tool: {tool_type}")  # Debug print
+        logger.debug("Selecting tool: %s", tool_type)
         # Deselect all tools first
         for tool in self.tools:
             tool.deselect()
@@ -56,7 +71,7 @@ class ToolBar:
             if tool.tool_type == tool_type:
                 tool.select()
                 self.selected_tool = tool
-                print(f"Tool selected: {tool.tool_type}")  # Debug print
+                logger.debug("Tool selected: %s", tool.tool_type)
                 return True
         return False
 
@@ -75,14 +90,20 @@ class ToolBar:
                 for other_tool in self.tools:
                     if other_tool != tool:
                         other_tool.selected = False
+                        self.game.scheduler.mark_dirty(other_tool)
                 tool.selected = not tool.selected
+                self.game.scheduler.mark_dirty(tool)
                 return True
         return False
 
 class Tool(pg.sprite.Sprite):
+    # Redrawn only when its selection changes
+    update_frequency = ON_CHANGE
+
     def __init__(self, game, x, y, tool_type, name, cost):
         self._layer = 2
-        self.groups = game.all_sprites, game.ui_elements
+        self.groups = (game.all_sprites, game.ui_elements,
+                       *game.scheduler.group_for(self.update_frequency))
         pg.sprite.Sprite.__init__(self, self.groups)
         self.game = game
         self.tool_type = tool_type
@@ -128,96 +149,185 @@ class Tool(pg.sprite.Sprite):
     def update(self):
         self.update_appearance()
 
+class HoverCursor(pg.sprite.Sprite):
+    """Translucent square drawn on top of the tile under the mouse.
+
+    Moving between tiles only moves its rect, so hovering never redraws
+    tile images; the image is rebuilt only when the zoom changes.
+    """
+    def __init__(self, game):
+        pg.sprite.Sprite.__init__(self)
+        self.game = game
+        self.image = None
+        self.rect = pg.Rect(0, 0, 0, 0)
+        self.visible = False
+
+    def move_to(self, tile):
+        """Cover a tile at the current camera view, or hide when tile is None"""
+        self.visible = tile is not None
+        if not self.visible:
+            return
+        camera = self.game.grid.camera
+        if self.image is None or self.image.get_width() != camera.tile_size:
+            self.image = pg.Surface((camera.tile_size, camera.tile_size), pg.SRCALPHA)
+            self.image.fill((255, 255, 255, 100))
+        self.rect = camera.tile_rect(tile.x, tile.y)
+
+    def draw(self, surface):
+        if self.visible:
+            surface.blit(self.image, self.rect)
+
+    def draw_over(self, surface, tiles):
+        """Draw the cursor over several tiles at once"""
+        if self.image is None:
+            return
+        camera = self.game.grid.camera
+        surface.blits([(self.image, camera.tile_rect(tile.x, tile.y)) for tile in tiles], False)
+
 class MouseController:
+    """Hover cursor and drag strokes over the grid during planning.
+
+    Pressing the mouse starts a stroke; while it is held, the stroke is
+    extended every frame through every tile between the previous and the
+    current mouse cell, so fast drags skip nothing. Releasing validates the
+    whole stroke against the placement rules and the budget and applies it
+    as one undoable step.
+    """
     def __init__(self, game):
         self.game = game
         self.toolbar = ToolBar(game)
+        self.cursor = HoverCursor(game)
         self.hover_tile = None
         self.dragging = False
-        self.last_placed = None
+        self.stroke = []           # Tiles of the current stroke, in the order first crossed
+        self.stroke_cells = set()
+        self.stroke_end = None     # Grid cell the stroke last reached
+
+    def reset(self):
+        """Clear hover and drag state and reset the toolbar for a new level"""
+        self.hover_tile = None
+        self.cursor.visible = False
+        self.cancel_stroke()
+        self.toolbar.reset()
 
     def update(self):
+        """Follow the mouse; call once per frame"""
         mouse_pos = pg.mouse.get_pos()
         self.update_hover(mouse_pos)
         if self.dragging:
-            self.handle_drag(mouse_pos)
+            if pg.mouse.get_pressed()[0]:
+                self.handle_drag(mouse_pos)
+            else:
+                self.cancel_stroke()  # Released while the game was not listening
 
     def update_hover(self, pos):
         # Only show hover effect during PLANNING state
         if self.game.state != PLANNING:
-            if self.hover_tile:
-                self.hover_tile.highlighted = False
-                self.hover_tile.update_appearance()
             self.hover_tile = None
-            return
+        else:
+            # Convert mouse position to grid coordinates
+            grid_x, grid_y = self.game.grid.pixel_to_grid(*pos)
+            self.hover_tile = self.game.grid.get_tile(grid_x, grid_y)
+        # Moved every frame, as the camera may have scrolled under the mouse
+        self.cursor.move_to(self.hover_tile)
 
-        # Convert mouse position to grid coordinates
-        grid_x, grid_y = self.game.grid.pixel_to_grid(*pos)
-        new_hover = self.game.grid.get_tile(grid_x, grid_y)
-        
-        # Update hover highlighting
-        if self.hover_tile != new_hover:
-            if self.hover_tile:
-                self.hover_tile.highlighted = False
-                self.hover_tile.update_appearance()
-            self.hover_tile = new_hover
-            if self.hover_tile:
-                self.hover_tile.highlighted = True
-                self.hover_tile.update_appearance() 
+    def draw(self, surface):
+        """Draw the hover cursor and, while dragging, the tiles the stroke will change"""
+        if self.dragging:
+            tool = self.toolbar.get_current_tool()
+            self.cursor.draw_over(surface, self.stroke_targets(tool) if tool else [])
+        self.cursor.draw(surface)
 
     def handle_click(self, pos, button):
-        print(f"Mouse click at {pos}, button {button}")  # Debug print
+        logger.debug("Mouse click at %s, button %s", pos, button)
         current_tool = self.toolbar.get_current_tool()
-        print(f"Current tool: {current_tool}")  # Debug print
+        logger.debug("Current tool: %s", current_tool)
 
         # Get clicked tile
         grid_x, grid_y = self.game.grid.pixel_to_grid(*pos)
         clicked_tile = self.game.grid.get_tile(grid_x, grid_y)
         
         if clicked_tile and self.game.state == PLANNING:
-            print(f"Valid tile clicked at ({grid_x}, {grid_y})")  # Debug print
+            logger.debug("Valid tile clicked at (%s, %s)", grid_x, grid_y)
+            log.events.record(log.EVENT_CLICK, grid_x, grid_y)
             if button == 1 and current_tool:  # Left click and tool selected
-                if self.can_place_infrastructure(clicked_tile, current_tool):
-                    print(f"Placing {current_tool} on tile")  # Debug print
-                    self.place_infrastructure(clicked_tile, current_tool)
-                else:
-                    print("Cannot place infrastructure here")  # Debug print
+                self.start_stroke(clicked_tile)
 
     def handle_release(self):
-        self.dragging = False
-        self.last_placed = None
+        if self.dragging:
+            self.apply_stroke()
+        self.cancel_stroke()
 
-    def start_placement(self, tile):
-        tool = self.toolbar.get_current_tool()
-        if tool and self.can_place_infrastructure(tile, tool):
-            self.place_infrastructure(tile, tool)
-            self.dragging = True
-            self.last_placed = tile
+    def start_stroke(self, tile):
+        """Begin a drag stroke on a tile"""
+        self.dragging = True
+        self.stroke = [tile]
+        self.stroke_cells = {(tile.x, tile.y)}
+        self.stroke_end = (tile.x, tile.y)
+
+    def cancel_stroke(self):
+        """Drop the current stroke without changing anything"""
+        self.dragging = False
+        self.stroke = []
+        self.stroke_cells = set()
+        self.stroke_end = None
 
     def handle_drag(self, pos):
-        grid_x, grid_y = self.game.grid.pixel_to_grid(*pos)
-        current_tile = self.game.grid.get_tile(grid_x, grid_y)
-        
-        if current_tile and current_tile != self.last_placed:
-            tool = self.toolbar.get_current_tool()
-            if tool and self.can_place_infrastructure(current_tile, tool):
-                self.place_infrastructure(current_tile, tool)
-                self.last_placed = current_tile
+        """Extend the stroke through every tile between its end and the cell under pos"""
+        grid = self.game.grid
+        cell = grid.pixel_to_grid(*pos)
+        if cell == self.stroke_end:
+            return
+        for tile in grid.tiles_on_line(*self.stroke_end, *cell):
+            if (tile.x, tile.y) not in self.stroke_cells:
+                self.stroke_cells.add((tile.x, tile.y))
+                self.stroke.append(tile)
+        self.stroke_end = cell
+
+    def stroke_targets(self, tool):
+        """Tiles of the stroke the tool would change, in order, within the budget"""
+        cost = 0 if tool == "remove" else INFRASTRUCTURE_COSTS[tool]
+        budget = self.game.resources
+        targets = []
+        for tile in self.stroke:
+            if self.can_place_infrastructure(tile, tool, budget):
+                targets.append(tile)
+                budget -= cost
+        return targets
+
+    def apply_stroke(self):
+        """Validate the stroke and apply it as one undoable step"""
+        tool = self.toolbar.get_current_tool()
+        if not tool:
+            return
+        targets = self.stroke_targets(tool)
+        if tool == "remove":
+            changed = self.game.command_log.remove_all(targets)
+            event = log.EVENT_REMOVE
+        else:
+            changed = self.game.command_log.place_all(targets, tool)
+            event = log.EVENT_PLACE
+        for tile in targets[:changed]:
+            log.events.record(event, tile.x, tile.y)
+        logger.debug("Stroke over %s tiles applied %s to %s, remaining resources: %s",
+                     len(self.stroke), tool, changed, self.game.resources)
 
-    def can_place_infrastructure(self, tile, tool_type):
+    def can_place_infrastructure(self, tile, tool_type, resources=None):
         """Determine if infrastructure can be placed on a given tile.
         
         The rules are:
         - Barriers can only be placed on river bank tiles
         - Vegetation can be placed on both land and river bank tiles
         - Cannot place anything on house tiles or existing infrastructure
-        - Must have sufficient resources
+        - Must have sufficient resources (the game's, unless `resources` is given)
         """
         if tool_type == "remove":
             return tile.has_infrastructure
         
         # Check if we have enough resources first
-        if self.game.resources < INFRASTRUCTURE_COSTS[tool_type]:
+        if resources is None:
+            resources = self.game.resources
+        if resources < INFRASTRUCTURE_COSTS[tool_type]:
             return False
             
         # Check if tile is already occupied
@@ -228,27 +338,6 @@ class MouseController:
         if tool_type == BARRIER:
             return tile.tile_type == RIVER_BANK  # Barriers only on river banks
         elif tool_type == VEGETATION:
-            return tile.tile_type in [LAND, RIVER_BANK]  # Trees on both land and river banks
+            return tile.tile_type != WATER  # Trees on both land and river banks
         
         return False
-
-    def place_infrastructure(self, tile, tool_type):
-        if tool_type == "remove":
-            self.remove_infrastructure(tile)
-            return
-
-        cost = INFRASTRUCTURE_COSTS[tool_type]
-        if self.game.resources >= cost:
-            Infrastructure(self.game, tile, tool_type)
-            self.game.resources -= cost
-            print(f"Placed {tool_type}, remaining resources: {self.game.resources}")
-
-    def remove_infrastructure(self, tile):
-        if tile.has_infrastructure:
-            for sprite in self.game.infrastructure:
-                if sprite.tile == tile:
-                    sprite.kill()
-                    tile.has_infrastructure = False
-                    # Optionally refund some resources
-                    self.game.resources += INFRASTRUCTURE_COSTS[sprite.infra_type] // 2
-                    break
\ No newline at end of file
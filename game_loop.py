@@ -9,15 +9,10 @@ class GameLoop:
 
     def update(self):
         """Update game state based on current phase."""
-        if self.game.state == PLANNING:
-            self.update_planning()
-        elif self.game.state == WEATHER:
+        # Planning is driven by input; Game.update polls the mouse once per frame
+        if self.game.state == WEATHER:
             self.update_weather()
 
-    def update_planning(self):
-        """Update planning phase."""
-        self.game.mouse_controller.update()
-
     def update_weather(self):
         """Update weather phase."""
         # Let water simulation handle everything during weather phase
@@ -1,18 +1,51 @@
 import pygame as pg
 from settings import *
-from sprites import Tile
+from journal import ChangeJournal
+from camera import Camera
+from chunks import ChunkStore
 import math
 import random
+import log
+
+logger = log.get_logger(log.GRID)
+
+class BandSampler:
+    """Draws the cells of a column band in random order, each at most once.
+
+    A lazy Fisher-Yates shuffle of the band's cell indices: only positions
+    swapped so far are stored, so every draw takes constant time however
+    much of the band has been drawn, and the band's cells are never listed.
+    """
+    def __init__(self, rng, x_start, x_end, height):
+        self.rng = rng
+        self.x_start = x_start
+        self.width = max(0, x_end - x_start)
+        self.remaining = self.width * height
+        self.swaps = {}
+
+    def draw(self):
+        """Next (x, y) of the band, or None once every cell has been drawn"""
+        if not self.remaining:
+            return None
+        pick = self.rng.randrange(self.remaining)
+        self.remaining -= 1
+        index = self.swaps.get(pick, pick)
+        self.swaps[pick] = self.swaps.pop(self.remaining, self.remaining)
+        return self.x_start + index % self.width, index // self.width
 
 class Grid:
-    def __init__(self, game, width, height):
+    def __init__(self, game, width, height, river_path=None, seed=None):
         self.game = game
+        self.random = random.Random(seed)  # The level's own generator, so the global one is left alone
         self.width = width
         self.height = height
-        self.tiles = [[None for x in range(width)] for y in range(height)]
-        self.tile_dict = {}
+        self.houses = []  # (x, y) positions of every placed house
+        self.infrastructure = {}  # (x, y) -> Infrastructure sprite on that tile
+        self.journal = ChangeJournal(self)
+        self.camera = Camera(width, height)
         self.base_river_x = self.width // 2 - 1  # Center the river
-        self.river_path = self.generate_river_path()
+        # A saved level brings its river path; otherwise it is generated from the seed
+        self.river_path = list(river_path) if river_path is not None else self.generate_river_path()
         self.initialize_grid()
 
     def generate_river_path(self):
@@ -23,9 +56,9 @@ class Grid:
         
         for y in range(self.height):
             if y > 0:
-                if random.random() < meandering_chance:
+                if self.random.random() < meandering_chance:
                     max_shift = 1
-                    shift = random.randint(-max_shift, max_shift)
+                    shift = self.random.randint(-max_shift, max_shift)
                     # Ensure river stays within reasonable bounds from center
                     current_x = max(self.width//4, min(3*self.width//4 - 4, current_x + shift))
             
@@ -39,46 +72,76 @@ class Grid:
         return smoothed_path
 
     def initialize_grid(self):
-        """Create initial grid layout with meandering river."""
-        # First create all land tiles
-        for y in range(self.height):
-            for x in range(self.width):
-                self.create_tile(x, y, LAND)
-        
-        # Then create river and banks using the pre-generated path
-        for y in range(self.height):
+        """Set up chunked tile storage; chunks are generated from the river path when first used."""
+        self.chunks = ChunkStore(self)
+
+    def generate_chunk(self, chunk_x, chunk_y, data):
+        """Fill a chunk's compact data with land, the river and its banks."""
+        size = self.chunks.chunk_size
+        cells = self.chunks.cells
+        x_start = chunk_x * size
+        for y in range(chunk_y * size, min((chunk_y + 1) * size, self.height)):
+            row_start = (y - chunk_y * size) * size
             river_center = self.river_path[y]
             
-            # Create river (2 tiles wide)
-            for x in [river_center, river_center + 1]:
-                self.tiles[y][x].tile_type = WATER
-            
-            # Create river banks
-            self.tiles[y][river_center - 1].tile_type = RIVER_BANK  # Left bank
-            self.tiles[y][river_center + 2].tile_type = RIVER_BANK  # Right bank
-            
-            # Update appearances
-            for x in [river_center - 1, river_center, river_center + 1, river_center + 2]:
-                self.tiles[y][x].initialize_tile()
-                self.tiles[y][x].update_appearance()
+            # River (2 tiles wide) with a bank on each side; everything else stays land
+            for x, tile_type in ((river_center - 1, RIVER_BANK), (river_center, WATER),
+                                 (river_center + 1, WATER), (river_center + 2, RIVER_BANK)):
+                if x_start <= x < x_start + size:
+                    index = row_start + x - x_start
+                    data[index] = tile_type
+                    data[cells + index] = 255 if tile_type == WATER else 0
 
     def get_river_center(self, y):
         """Get the river center for a given row."""
         return self.river_path[y]
         
     def create_tile(self, x, y, tile_type):
-        """Create a new tile at the specified grid position"""
-        tile = Tile(self.game, x, y, tile_type)
-        self.tiles[y][x] = tile
-        self.tile_dict[(x, y)] = tile
-        return tile
+        """Create the Tile object for a grid position; the chunk store keeps it"""
+        return self.game.tile_pool.acquire(x, y, tile_type)
+
+    def release_tile(self, tile):
+        """Hand a Tile object the chunk store no longer needs back to the pool"""
+        self.game.tile_pool.release(tile)
+
+    def release(self):
+        """Return all of this grid's tiles and infrastructure to the game's pools"""
+        with self.chunks.lock:
+            for tile in self.chunks.materialized_tiles():
+                self.release_tile(tile)
+            self.chunks.materialized.clear()
+            self.journal.clear()
+            for infra in self.infrastructure.values():
+                self.game.infrastructure_pool.release(infra)
+            self.infrastructure.clear()
+            self.chunks.close()
     
     def get_tile(self, x, y):
         """Get tile at grid coordinates"""
         if 0 <= x < self.width and 0 <= y < self.height:
-            return self.tiles[y][x]
+            return self.chunks.get_tile(x, y)
         return None
 
+    def tiles_on_line(self, x0, y0, x1, y1):
+        """Tiles a straight line between two cells crosses, in order and edge-connected"""
+        dx, dy = abs(x1 - x0), abs(y1 - y0)
+        step_x = 1 if x1 > x0 else -1
+        step_y = 1 if y1 > y0 else -1
+        x, y = x0, y0
+        cells = [(x, y)]
+        moved_x = moved_y = 0
+        while moved_x < dx or moved_y < dy:
+            # Step across whichever cell edge the line reaches first
+            if (1 + 2 * moved_x) * dy < (1 + 2 * moved_y) * dx:
+                x += step_x
+                moved_x += 1
+            else:
+                y += step_y
+                moved_y += 1
+            cells.append((x, y))
+        tiles = (self.get_tile(x, y) for x, y in cells)
+        return [tile for tile in tiles if tile]
+
     def get_neighbors(self, tile):
         """Get all adjacent tiles"""
         x, y = tile.x, tile.y
@@ -93,12 +156,33 @@ class Grid:
         return neighbors
 
     def grid_to_pixel(self, grid_x, grid_y):
-        """Convert grid coordinates to pixel coordinates"""
-        return (grid_x * TILESIZE, grid_y * TILESIZE)
+        """Convert grid coordinates to screen pixel coordinates"""
+        return self.camera.grid_to_screen(grid_x, grid_y)
 
     def pixel_to_grid(self, pixel_x, pixel_y):
-        """Convert pixel coordinates to grid coordinates"""
-        return (pixel_x // TILESIZE, pixel_y // TILESIZE)
+        """Convert screen pixel coordinates to grid coordinates"""
+        return self.camera.screen_to_grid(pixel_x, pixel_y)
+
+    def visible_tiles(self):
+        """Yield (tile, screen rect) for every tile inside the camera view"""
+        size = self.camera.tile_size
+        origin_x, origin_y = self.camera.origin
+        x_start, y_start, x_end, y_end = self.camera.visible_range()
+        get_tile = self.chunks.get_tile
+        for y in range(y_start, y_end):
+            screen_y = y * size - origin_y
+            for x in range(x_start, x_end):
+                yield get_tile(x, y), pg.Rect(x * size - origin_x, screen_y, size, size)
+
+    def draw(self, surface):
+        """Draw the visible tiles and the infrastructure standing on them"""
+        camera = self.camera
+        for tile, rect in self.visible_tiles():
+            surface.blit(camera.scale(tile), rect)
+            if tile.has_infrastructure:
+                infra = self.get_infrastructure(tile)
+                if infra:
+                    surface.blit(camera.scale(infra), rect)
 
     def is_valid_tile(self, x, y):
         """Check if the given coordinates are within grid bounds"""
@@ -112,7 +196,7 @@ class Grid:
         for y in range(cy - range_, cy + range_ + 1):
             for x in range(cx - range_, cx + range_ + 1):
                 if self.is_valid_tile(x, y):
-                    tiles.append(self.tiles[y][x])
+                    tiles.append(self.get_tile(x, y))
         
         return tiles
 
@@ -124,7 +208,7 @@ class Grid:
         # Calculate water distribution
         for y in range(self.height):
             for x in range(self.width):
-                tile = self.tiles[y][x]
+                tile = self.get_tile(x, y)
                 if tile.water_level > 0:
                     neighbors = self.get_neighbors(tile)
                     flowing_water = 0
@@ -149,71 +233,116 @@ class Grid:
         
         # Apply new water levels
         for (x, y), level in new_water_levels.items():
-            self.tiles[y][x].update_water_level(level)
+            self.get_tile(x, y).update_water_level(level)
     
     def place_houses(self, house_count=3):
         """Place houses based on difficulty level configuration."""
-        # Collect valid tiles
-        valid_tiles_left = []
-        valid_tiles_right = []
-        
         river_center = self.width // 2
         
-        for y in range(self.height):
-            # Left side tiles (excluding river bank area)
-            for x in range(0, river_center - 2):
-                tile = self.tiles[y][x]
-                if tile.tile_type == LAND:
-                    valid_tiles_left.append(tile)
-            
-            # Right side tiles (excluding river bank area)
-            for x in range(river_center + 3, self.width):
-                tile = self.tiles[y][x]
-                if tile.tile_type == LAND:
-                    valid_tiles_right.append(tile)
-        
-        # Shuffle to randomize placement
-        random.shuffle(valid_tiles_left)
-        random.shuffle(valid_tiles_right)
+        # Column bands on each side (excluding river bank area)
+        left_band = BandSampler(self.random, 0, river_center - 2, self.height)
+        right_band = BandSampler(self.random, river_center + 3, self.width, self.height)
         
         # Place houses ensuring some are on both sides if possible
         houses_placed = 0
+        left_open = right_open = True
         
         # Try to place houses on different sides
-        while houses_placed < house_count and (valid_tiles_left or valid_tiles_right):
+        while houses_placed < house_count and (left_open or right_open):
             # Attempt to place on left side
-            if valid_tiles_left and houses_placed < house_count:
-                house_tile = valid_tiles_left.pop()
-                house_tile.is_house = True
-                house_tile.update_appearance()
-                houses_placed += 1
+            if left_open and houses_placed < house_count:
+                house_tile = self.random_land_tile(left_band)
+                if house_tile:
+                    self.place_house(house_tile)
+                    houses_placed += 1
+                else:
+                    left_open = False
             
             # Attempt to place on right side
-            if valid_tiles_right and houses_placed < house_count:
-                house_tile = valid_tiles_right.pop()
-                house_tile.is_house = True
-                house_tile.update_appearance()
-                houses_placed += 1
+            if right_open and houses_placed < house_count:
+                house_tile = self.random_land_tile(right_band)
+                if house_tile:
+                    self.place_house(house_tile)
+                    houses_placed += 1
+                else:
+                    right_open = False
         
-        print(f"Placed {houses_placed} houses")
+        logger.debug("Placed %s houses", houses_placed)
+
+    def random_land_tile(self, band):
+        """Draw tiles from a BandSampler until one is land without a house; None when exhausted."""
+        while True:
+            cell = band.draw()
+            if cell is None:
+                return None
+            tile = self.get_tile(*cell)
+            if tile.tile_type == LAND and not tile.is_house:
+                return tile
+
+    def place_house(self, tile):
+        """Turn a tile into a house and add it to the house index."""
+        tile.is_house = True
+        tile.update_appearance()
+        self.houses.append((tile.x, tile.y))
+
+    def get_houses(self):
+        """Get all house tiles."""
+        return [self.get_tile(x, y) for x, y in self.houses]
+
+    def get_infrastructure(self, tile):
+        """Get the infrastructure sprite on a tile, if any"""
+        return self.infrastructure.get((tile.x, tile.y))
+
+    def place_infrastructure(self, tile, infra_type):
+        """Build infrastructure on a tile and record it in the journal"""
+        infra = self.game.infrastructure_pool.acquire(tile, infra_type)
+        self.infrastructure[(tile.x, tile.y)] = infra
+        self.journal.record_infrastructure(infra, placed=True)
+        return infra
+
+    def remove_infrastructure(self, tile):
+        """Remove the infrastructure on a tile and record it in the journal"""
+        infra = self.get_infrastructure(tile)
+        if infra:
+            self.detach_infrastructure(infra)
+            if not self.journal.record_infrastructure(infra, placed=False):
+                self.release_infrastructure(infra)
+        return infra
+
+    def attach_infrastructure(self, infra):
+        """Put an existing infrastructure sprite back on its tile"""
+        infra.add(infra.groups)  # Every group it was built in, the scheduler's included
+        infra.tile.has_infrastructure = True
+        self.infrastructure[(infra.tile.x, infra.tile.y)] = infra
+
+    def detach_infrastructure(self, infra):
+        """Take an infrastructure sprite off its tile"""
+        infra.kill()
+        infra.tile.has_infrastructure = False
+        self.infrastructure.pop((infra.tile.x, infra.tile.y), None)
+
+    def release_infrastructure(self, infra):
+        """Hand an infrastructure sprite that is off the grid for good back to the pool"""
+        self.game.infrastructure_pool.release(infra)
+
+    def snapshot(self):
+        """Capture the current grid state; restore() returns to it"""
+        return self.journal.mark()
+
+    def restore(self, snapshot):
+        """Return the grid to a state captured by snapshot()"""
+        return self.journal.rollback(snapshot)
 
     def apply_infrastructure_effects(self):
         """Update grid based on infrastructure effects"""
-        for y in range(self.height):
-            for x in range(self.width):
-                tile = self.tiles[y][x]
-                if tile.has_infrastructure:
-                    infra = next((sprite for sprite in self.game.infrastructure 
-                                if sprite.tile == tile), None)
-                    if infra:
-                        # Apply infrastructure effects
-                        if infra.infra_type == BARRIER:
-                            # Reduce water level on protected side
-                            protected_tile = self.get_tile(x + 1, y)  # Example: protects right side
-                            if protected_tile:
-                                protected_tile.update_water_level(-0.2 * infra.efficiency)
-                        elif infra.infra_type == VEGETATION:
-                            # Increase water absorption
-                            tile.update_water_level(-0.1 * infra.efficiency)
-
-    
\ No newline at end of file
+        for (x, y), infra in list(self.infrastructure.items()):
+            tile = self.get_tile(x, y)
+            # Apply infrastructure effects
+            if infra.infra_type == BARRIER:
+                # Reduce water level on protected side
+                protected_tile = self.get_tile(x + 1, y)  # Example: protects right side
+                if protected_tile:
+                    protected_tile.update_water_level(-0.2 * infra.efficiency)
+            elif infra.infra_type == VEGETATION:
+                # Increase water absorption
+                tile.update_water_level(-0.1 * infra.efficiency)
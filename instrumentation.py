@@ -0,0 +1,42 @@
+import pygame as pg
+from collections import deque
+from settings import *
+
+class Instrumentation:
+    """Per-frame counters and frame times, shown in a debug overlay toggled with F3."""
+    def __init__(self):
+        self.counters = {}
+        self.frame_times = deque(maxlen=FRAME_HISTORY)
+        self.visible = False
+        self.font = None
+
+    def count(self, name, value):
+        """Record this frame's value for a counter"""
+        self.counters[name] = value
+
+    def record_frame(self, dt):
+        """Record how long the last frame took, in seconds"""
+        self.frame_times.append(dt)
+
+    def average_frame_ms(self):
+        """Mean frame time over the recorded history, in milliseconds"""
+        if not self.frame_times:
+            return 0.0
+        return 1000 * sum(self.frame_times) / len(self.frame_times)
+
+    def toggle(self):
+        """Show or hide the overlay"""
+        self.visible = not self.visible
+
+    def draw(self, surface):
+        """Draw the counters in the top-left corner"""
+        if not self.visible:
+            return
+        if self.font is None:
+            self.font = pg.font.Font(None, 20)
+
+        lines = [f"frame: {self.average_frame_ms():.1f} ms"]
+        lines += [f"{name}: {value}" for name, value in self.counters.items()]
+        for i, text in enumerate(lines):
+            text_surface = self.font.render(text, True, YELLOW, BLACK)
+            surface.blit(text_surface, (5, 5 + i * 18))
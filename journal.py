@@ -0,0 +1,78 @@
+from settings import *
+
+# Marker for attributes that did not exist before they were first set
+_MISSING = object()
+# Entry tag for infrastructure placed on or removed from a tile
+_INFRASTRUCTURE = "infrastructure"
+
+class ChangeJournal:
+    """Ordered record of grid cell mutations that can be rolled back.
+
+    Every entry holds the cell coordinates, the attribute that changed and the
+    value it had before, so rolling back to a mark only touches the cells that
+    actually changed since that mark. Changes are only recorded from the
+    first mark until everything is rolled back or cleared; planning edits in
+    between floods are undone by the CommandLog instead.
+    """
+    def __init__(self, grid):
+        self.grid = grid
+        self.entries = []
+        self.recording = False
+
+    def set_attr(self, tile, attr, value):
+        """Set a tile attribute, recording its previous value."""
+        old_value = getattr(tile, attr, _MISSING)
+        if old_value is not _MISSING and old_value == value:
+            return
+        if self.recording:
+            self.entries.append((tile.x, tile.y, attr, old_value))
+        setattr(tile, attr, value)
+
+    def record_infrastructure(self, infra, placed):
+        """Record that an infrastructure sprite was placed or removed; False when not recording."""
+        if self.recording:
+            self.entries.append((infra.tile.x, infra.tile.y, _INFRASTRUCTURE, (infra, placed)))
+        return self.recording
+
+    def mark(self):
+        """Return a position that can later be rolled back to, recording from now on."""
+        self.recording = True
+        return len(self.entries)
+
+    def rollback(self, mark):
+        """Undo every change recorded after the given mark."""
+        touched = set()
+        while len(self.entries) > mark:
+            x, y, attr, old_value = self.entries.pop()
+            if attr == _INFRASTRUCTURE:
+                infra, placed = old_value
+                if placed:
+                    self.grid.detach_infrastructure(infra)
+                    self.grid.release_infrastructure(infra)
+                else:
+                    self.grid.attach_infrastructure(infra)
+            else:
+                tile = self.grid.get_tile(x, y)
+                if old_value is _MISSING:
+                    delattr(tile, attr)
+                else:
+                    setattr(tile, attr, old_value)
+            touched.add((x, y))
+        if not self.entries:
+            self.recording = False
+
+        # Redraw each changed cell once, a chunk at a time so no chunk is
+        # materialized more than once however many the rollback spans
+        size = self.grid.chunks.chunk_size
+        touched = sorted(touched, key=lambda cell: (cell[1] // size, cell[0] // size))
+        for x, y in touched:
+            self.grid.get_tile(x, y).update_appearance()
+        return touched
+
+    def clear(self):
+        """Forget all recorded changes and stop recording."""
+        for x, y, attr, old_value in self.entries:
+            if attr == _INFRASTRUCTURE and not old_value[1]:
+                self.grid.release_infrastructure(old_value[0])  # Removed; only the journal held it
+        self.entries.clear()
+        self.recording = False
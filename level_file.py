@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+import argparse
+import mmap
+import os
+import struct
+import sys
+from collections import namedtuple
+from settings import *
+from command_log import Command, PLACE, apply_solution
+
+LEVEL_VERSION = 1
+LEVEL_MAGIC = b"FLVL"
+COLLECTION_MAGIC = b"FLVC"
+LEVEL_EXTENSION = ".flv"
+
+# magic, version, difficulty, outcome (0 = not played), width, height, seed, house count
+LEVEL_HEADER = struct.Struct("<4sHBBHHIH")
+# magic, version, level count; followed by a table of record offsets
+COLLECTION_HEADER = struct.Struct("<4sHI")
+OFFSET = struct.Struct("<Q")
+
+# Infrastructure is packed two bits per cell, four cells to a byte, in row-major order
+LAYOUT_TYPES = (None, BARRIER, VEGETATION)
+LAYOUT_CODES = {infra_type: code for code, infra_type in enumerate(LAYOUT_TYPES) if infra_type}
+
+# A level as saved: enough to rebuild it without regenerating anything.
+# layout maps (x, y) to an infrastructure type; outcome is GAME_OVER, VICTORY or None
+LevelRecord = namedtuple("LevelRecord", "difficulty seed width height river_path houses layout outcome")
+
+def record_from_game(game, outcome=None):
+    """Describe the game's current level and infrastructure as a LevelRecord."""
+    grid = game.grid
+    layout = {cell: infra.infra_type for cell, infra in grid.infrastructure.items()}
+    if outcome is None and game.state in END_STATES:
+        outcome = game.state
+    return LevelRecord(game.current_difficulty, game.level_seed, grid.width, grid.height,
+                       tuple(grid.river_path), tuple(grid.houses), layout, outcome)
+
+def pack_layout(layout, width, height):
+    """Bit-pack an infrastructure layout, two bits per cell."""
+    packed = bytearray((width * height + 3) // 4)
+    for (x, y), infra_type in layout.items():
+        cell = y * width + x
+        packed[cell >> 2] |= LAYOUT_CODES[infra_type] << ((cell & 3) * 2)
+    return packed
+
+def unpack_layout(packed, width):
+    """Read a bit-packed layout; empty bytes, most of a level, are skipped whole."""
+    layout = {}
+    for index, byte in enumerate(packed):
+        if byte:
+            for shift in range(4):
+                code = (byte >> (shift * 2)) & 3
+                if code:
+                    cell = index * 4 + shift
+                    layout[(cell % width, cell // width)] = LAYOUT_TYPES[code]
+    return layout
+
+def pack_level(level):
+    """Encode a LevelRecord as bytes."""
+    houses = [coordinate for house in level.houses for coordinate in house]
+    return b"".join((
+        LEVEL_HEADER.pack(LEVEL_MAGIC, LEVEL_VERSION, level.difficulty, level.outcome or 0,
+                          level.width, level.height, level.seed & 0xffffffff, len(level.houses)),
+        struct.pack(f"<{level.height}H", *level.river_path),
+        struct.pack(f"<{len(houses)}H", *houses),
+        pack_layout(level.layout, level.width, level.height),
+    ))
+
+def unpack_level(buffer, offset=0):
+    """Decode the LevelRecord at an offset of a bytes-like object (or an mmap)."""
+    magic, version, difficulty, outcome, width, height, seed, house_count = \
+        LEVEL_HEADER.unpack_from(buffer, offset)
+    if magic != LEVEL_MAGIC:
+        raise ValueError("Not a level record")
+    if version != LEVEL_VERSION:
+        raise ValueError(f"Unsupported level version: {version}")
+    offset += LEVEL_HEADER.size
+    river_path = struct.unpack_from(f"<{height}H", buffer, offset)
+    offset += 2 * height
+    houses = struct.unpack_from(f"<{2 * house_count}H", buffer, offset)
+    offset += 4 * house_count
+    packed = memoryview(buffer)[offset:offset + (width * height + 3) // 4]
+    return LevelRecord(difficulty, seed, width, height, river_path,
+                       tuple(zip(houses[::2], houses[1::2])), unpack_layout(packed, width),
+                       GameState(outcome) if outcome else None)
+
+def save_level(path, level):
+    """Write one LevelRecord to a file."""
+    with open(path, "wb") as f:
+        f.write(pack_level(level))
+
+def read_level(path):
+    """Read a file written by save_level."""
+    with open(path, "rb") as f:
+        return unpack_level(f.read())
+
+def write_collection(path, levels):
+    """Write many LevelRecords to one file that LevelCollection can map."""
+    records = [pack_level(level) for level in levels]
+    offset = COLLECTION_HEADER.size + OFFSET.size * len(records)
+    with open(path, "wb") as f:
+        f.write(COLLECTION_HEADER.pack(COLLECTION_MAGIC, LEVEL_VERSION, len(records)))
+        for record in records:
+            f.write(OFFSET.pack(offset))
+            offset += len(record)
+        for record in records:
+            f.write(record)
+
+class LevelCollection:
+    """Read-only, memory-mapped collection of levels written by write_collection.
+
+    Opening a collection reads only its header; each level is decoded from
+    the mapped file when it is indexed, so a corpus of any size can be
+    opened at once and only the pages actually read are loaded.
+    """
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = COLLECTION_HEADER.unpack_from(self.data)
+        if magic != COLLECTION_MAGIC:
+            self.close()
+            raise ValueError(f"Not a level collection: {path}")
+        if version != LEVEL_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported level version: {version}")
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not -self.count <= index < self.count:
+            raise IndexError("level index out of range")
+        offset, = OFFSET.unpack_from(self.data, COLLECTION_HEADER.size + OFFSET.size * (index % self.count))
+        return unpack_level(self.data, offset)
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def load_level(game, level):
+    """Set the game up on a saved level, its infrastructure placed as one undoable step."""
+    game.new(level=level)
+    commands = tuple(Command(PLACE, x, y, infra_type, -INFRASTRUCTURE_COSTS[infra_type])
+                     for (x, y), infra_type in sorted(level.layout.items()))
+    if commands:
+        game.command_log.execute_step(commands)
+
+def evaluate_level(game, level):
+    """Load a level and run its flood to the end, returning GAME_OVER or VICTORY."""
+    load_level(game, level)
+    game.state = WEATHER
+    game.water_sim.process_flooding()
+    game.water_sim.check_game_state()
+    return game.state
+
+def start_headless_game():
+    """Create a game without a window and run its startup loader"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from main import Game  # main.py saves levels through this module
+    game = Game(headless=True)
+    while game.state == LOADING:
+        game.step()
+    return game
+
+def pack_solutions(output, solution_paths):
+    """
+    Evaluate solution files and write them, with their outcomes, to a level collection.
+
+    Args:
+        output (str): Collection file to write
+        solution_paths (list): Solution JSON files written with Ctrl+S
+    """
+    game = start_headless_game()
+    levels = []
+    for path in solution_paths:
+        apply_solution(game, path)
+        level = record_from_game(game)
+        levels.append(level._replace(outcome=evaluate_level(game, level)))
+        print(f"{path}: {levels[-1].outcome}")
+    write_collection(output, levels)
+    print(f"Wrote {len(levels)} levels to {output}")
+
+def evaluate_collection(path):
+    """
+    Re-evaluate every level of a collection and report the ones whose outcome changed.
+
+    Args:
+        path (str): Collection file written by write_collection
+
+    Returns:
+        int: Number of levels whose outcome differs from the saved one
+    """
+    game = start_headless_game()
+    changed = 0
+    with LevelCollection(path) as levels:
+        for index in range(len(levels)):
+            level = levels[index]
+            outcome = evaluate_level(game, level)
+            if level.outcome is not None and outcome != level.outcome:
+                changed += 1
+                print(f"Level {index} (difficulty {level.difficulty}, seed {level.seed}): "
+                      f"{level.outcome} -> {outcome}")
+        print(f"Evaluated {len(levels)} levels, {changed} changed outcome")
+    return changed
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack and re-evaluate collections of saved levels")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack = commands.add_parser("pack", help="Evaluate solution files into a level collection")
+    pack.add_argument("output", help="Collection file to write")
+    pack.add_argument("solutions", nargs="+", help="Solution JSON files")
+    evaluate = commands.add_parser("evaluate", help="Re-evaluate every level of a collection")
+    evaluate.add_argument("collection", help="Collection file to read")
+
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        pack_solutions(args.output, args.solutions)
+    elif evaluate_collection(args.collection):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import pygame as pg
+import time
+from settings import *
+from sprites import Tile, Infrastructure
+from weather_effects import RainEffect
+from ui import UI
+from controller import MouseController
+from sound_manager import SoundManager
+import log
+
+logger = log.get_logger(log.GAME)
+
+class StartupLoader:
+    """Loads the game's assets one stage per frame behind a progress screen.
+
+    The game loop calls `step()` once per frame while the game is in the
+    LOADING state, so the window is shown and kept responsive (and, in the
+    browser build, the asyncio loop keeps running) while images, fonts and
+    the mixer are prepared. Time to first frame and time to interactive are
+    measured from `started`, the perf_counter() time the game began starting up.
+    """
+    def __init__(self, game, started):
+        self.game = game
+        self.started = started
+        self.font = pg.font.Font(None, 32)
+        self.stages = [
+            ("Interface", self.load_interface),
+            ("Title screen", self.load_title_screen),
+            ("Toolbar", self.load_toolbar),
+            ("Tiles", Tile.preload_images),
+            ("Infrastructure", Infrastructure.preload_images),
+            ("Rain", RainEffect.preload_sheets),
+            ("Sound", self.load_sound),
+        ]
+        self.completed = 0
+        self.time_to_first_frame = None
+        self.time_to_interactive = None
+
+    @property
+    def progress(self):
+        """Fraction of the stages completed"""
+        return self.completed / len(self.stages)
+
+    def step(self):
+        """Run the next loading stage; switch to the menu after the last one"""
+        if self.time_to_first_frame is None:
+            return  # Show the progress screen before doing any work
+        if self.completed < len(self.stages):
+            name, stage = self.stages[self.completed]
+            stage_start = time.perf_counter()
+            stage()
+            self.completed += 1
+            logger.debug("Loaded %s in %.1f ms", name, 1000 * (time.perf_counter() - stage_start))
+
+        if self.completed == len(self.stages):
+            self.time_to_interactive = time.perf_counter() - self.started
+            self.game.instrumentation.count("time to interactive ms", round(1000 * self.time_to_interactive))
+            logger.info("Time to first frame: %.1f ms, time to interactive: %.1f ms",
+                        1000 * self.time_to_first_frame, 1000 * self.time_to_interactive)
+            self.game.state = MENU
+
+    def load_interface(self):
+        self.game.ui = UI(self.game)
+
+    def load_title_screen(self):
+        self.game.ui.load_start_screen()
+
+    def load_toolbar(self):
+        self.game.mouse_controller = MouseController(self.game)
+
+    def load_sound(self):
+        self.game.sound_manager = SoundManager()
+        self.game.quality.apply()
+
+    def draw(self, surface):
+        """Draw the loading progress bar"""
+        surface.fill(BLACK)
+        if self.completed < len(self.stages):
+            label = f"Loading {self.stages[self.completed][0].lower()}..."
+        else:
+            label = "Ready"
+        text = self.font.render(label, True, WHITE)
+        surface.blit(text, text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 30)))
+
+        bar = pg.Rect(0, 0, WIDTH // 2, 20)
+        bar.center = (WIDTH // 2, HEIGHT // 2 + 10)
+        pg.draw.rect(surface, UI_GRAY, bar, 2)
+        filled = bar.inflate(-6, -6)
+        filled.width = int(filled.width * self.progress)
+        pg.draw.rect(surface, UI_HIGHLIGHT, filled)
+
+    def frame_shown(self):
+        """Note that a frame reached the screen"""
+        if self.time_to_first_frame is None:
+            self.time_to_first_frame = time.perf_counter() - self.started
+            self.game.instrumentation.count("time to first frame ms", round(1000 * self.time_to_first_frame))
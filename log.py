@@ -0,0 +1,128 @@
+import struct
+import time
+from settings import *
+
+# Log levels
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+OFF = ERROR + 10
+
+# Log categories
+GAME = "game"
+INPUT = "input"
+GRID = "grid"
+SIMULATION = "simulation"
+CONTROLLER = "controller"
+AUDIO = "audio"
+
+# Binary event codes
+EVENT_LEVEL_START = 1     # a = difficulty, b = seed (low 31 bits)
+EVENT_KEY = 2             # a = key code
+EVENT_CLICK = 3           # a = grid x, b = grid y
+EVENT_PLACE = 4           # a = grid x, b = grid y
+EVENT_REMOVE = 5          # a = grid x, b = grid y
+EVENT_HOUSE_FLOODED = 6   # a = grid x, b = grid y
+EVENT_VICTORY = 7         # a = houses protected
+EVENT_NAMES = {
+    EVENT_LEVEL_START: "level_start",
+    EVENT_KEY: "key",
+    EVENT_CLICK: "click",
+    EVENT_PLACE: "place",
+    EVENT_REMOVE: "remove",
+    EVENT_HOUSE_FLOODED: "house_flooded",
+    EVENT_VICTORY: "victory",
+}
+
+def _noop(*args):
+    pass
+
+class Logger:
+    """Leveled logger for one category.
+
+    Each level method is bound either to a printer or to a no-op when the
+    level is disabled, so a disabled call costs one empty function call.
+    Messages use %-style arguments so they are only formatted when printed.
+    """
+    def __init__(self, category):
+        self.category = category
+        self.configure(*_config)
+
+    def configure(self, level, categories):
+        """Rebind the level methods for a level name and category filter"""
+        enabled = LEVELS[level]
+        if categories is not None and self.category not in categories:
+            enabled = OFF
+        for name, value in LEVELS.items():
+            setattr(self, name, self.printer(name) if value >= enabled else _noop)
+        self.debug_enabled = DEBUG >= enabled
+
+    def printer(self, level_name):
+        prefix = f"[{level_name.upper()}] {self.category}:"
+
+        def emit(message, *args):
+            print(prefix, message % args if args else message)
+        return emit
+
+_loggers = {}
+_config = [LOG_LEVEL, LOG_CATEGORIES]
+
+def get_logger(category):
+    """Get the shared logger for a category"""
+    if category not in _loggers:
+        _loggers[category] = Logger(category)
+    return _loggers[category]
+
+def configure(level=LOG_LEVEL, categories=LOG_CATEGORIES):
+    """Change the level and category filter of every logger, current and future"""
+    _config[:] = [level, categories]
+    for logger in _loggers.values():
+        logger.configure(level, categories)
+
+class EventLog:
+    """Fixed-size ring buffer of binary event records for diagnostics.
+
+    Each record is a timestamp, an event code and two integer arguments
+    packed into a preallocated buffer; once full, the oldest records are
+    overwritten. With a capacity of 0, `record` is a no-op.
+    """
+    RECORD = struct.Struct("<dHii")
+
+    def __init__(self, capacity=EVENT_LOG_CAPACITY):
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * self.RECORD.size)
+        self.count = 0
+        if not capacity:
+            self.record = _noop
+
+    def record(self, event, a=0, b=0):
+        """Append an event, overwriting the oldest one when full"""
+        offset = (self.count % self.capacity) * self.RECORD.size
+        self.RECORD.pack_into(self.buffer, offset, time.perf_counter(), event, a, b)
+        self.count += 1
+
+    def records(self):
+        """Get the stored (time, event, a, b) records, oldest first"""
+        stored = min(self.count, self.capacity)
+        first = self.count - stored
+        return [self.RECORD.unpack_from(self.buffer, (i % self.capacity) * self.RECORD.size)
+                for i in range(first, self.count)]
+
+    def dump(self, path):
+        """Write the stored records, oldest first, to a binary file"""
+        with open(path, "wb") as f:
+            for record in self.records():
+                f.write(self.RECORD.pack(*record))
+        return path
+
+def read_event_log(path):
+    """Read a file written by EventLog.dump as (time, event name, a, b) tuples"""
+    with open(path, "rb") as f:
+        data = f.read()
+    return [(t, EVENT_NAMES.get(event, event), a, b)
+            for t, event, a, b in EventLog.RECORD.iter_unpack(data)]
+
+# Shared diagnostics event log
+events = EventLog()
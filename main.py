@@ -9,51 +9,114 @@ from ui import UI
 from game_loop import GameLoop
 from controller import *
 from sound_manager import SoundManager
+from command_log import CommandLog
+import level_file
+from pool import SpritePool
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from scheduler import UpdateScheduler
+from instrumentation import Instrumentation
+from loader import StartupLoader
+from timestep import FixedTimestep
+from quality import QualityGovernor
+import time
+import log
+import random
 import asyncio
 
+logger = log.get_logger(log.GAME)
+input_log = log.get_logger(log.INPUT)
+
 class Game:
-    def __init__(self):
-        pg.init()
+    def __init__(self, speed=1, headless=False):
+        """
+        Args:
+            speed (int): Simulation ticks run per tick of real time
+            headless (bool): Skip rendering and run ticks as fast as possible
+        """
+        started = time.perf_counter()
+        # Only what the loading screen needs; the mixer starts in a loading stage
+        pg.display.init()
+        pg.font.init()
         self.screen = pg.display.set_mode((WIDTH, HEIGHT))
         pg.display.set_caption(TITLE)
         self.clock = pg.time.Clock()
+        self.dt = 0
+        self.timestep = FixedTimestep(speed, headless)
+        self.total_ticks = 0
         
         # Initialize sprite groups
         self.all_sprites = pg.sprite.Group()
-        self.tiles = pg.sprite.Group()
         self.infrastructure = pg.sprite.Group()
         self.ui_elements = pg.sprite.Group()
         
-        # Initialize controllers and UI
-        self.mouse_controller = MouseController(self)
-        self.ui = UI(self)
-        self.game_loop = GameLoop(self)
+        # Sprites are updated by frequency rather than all every frame
+        self.scheduler = UpdateScheduler()
+        self.instrumentation = Instrumentation()
         
-        # Initialize sound manager
-        self.sound_manager = SoundManager()
+        # Sprites are recycled between levels instead of rebuilt
+        self.tile_pool = SpritePool(partial(Tile, self))
+        self.infrastructure_pool = SpritePool(partial(Infrastructure, self))
+        self.grid = None
+        
+        # Unanimated floods are evaluated on a worker thread, except in the browser build
+        # which has none and headless, where a flood finishing within its tick keeps runs repeatable
+        if BACKGROUND_FLOOD and not ANIMATE_FLOOD and not headless and sys.platform != "emscripten":
+            self.flood_executor = ThreadPoolExecutor(max_workers=1)
+        else:
+            self.flood_executor = None
+        
+        # UI, controllers and sound are created by the startup loader
+        self.mouse_controller = None
+        self.ui = None
+        self.sound_manager = None
+        self.loader = StartupLoader(self, started)
+        self.game_loop = GameLoop(self)
         
         # Initialize game attributes
         self.resources = STARTING_RESOURCES
         self.score = 0
         self.flood_percentage = 0
-        self.state = MENU
+        self.state = LOADING
         self.running = True
 
         self.rain_effect = RainEffect(self)
         self.water_overlay = WaterOverlay(self)
         self.current_difficulty = None
+        
+        # Effects are scaled down when frames run over budget
+        self.quality = QualityGovernor(self, ADAPTIVE_QUALITY and not headless)
+        self.quality.apply()
 
     async def run(self):
         while self.running:
-            self.dt = self.clock.tick(FPS) / 1000
-            self.events()
-            self.update()
-            self.draw()
+            self.step()
             await asyncio.sleep(0)  # Yield control back to the event loop
 
-    def new(self, difficulty_level=2):
-        """Initialize a new game/level"""
-        print(f"Starting new game at difficulty level {difficulty_level}")
+    def step(self):
+        """Run one frame: input, the simulation ticks that are due, then rendering"""
+        headless = self.timestep.headless
+        self.dt = self.clock.tick(0 if headless else FPS) / 1000
+        self.instrumentation.record_frame(self.dt)
+        self.quality.record_frame(self.clock.get_rawtime())
+        self.instrumentation.count("quality", self.quality.level)
+        self.events()
+        self.update()
+        # The loading screen is still drawn headless; loading waits for its first frame
+        if not headless or self.state == LOADING:
+            self.draw()
+
+    def new(self, difficulty_level=2, seed=None, level=None):
+        """Initialize a new game/level; the same seed regenerates the same map.
+
+        A saved LevelRecord (see level_file.py) is rebuilt as saved instead of regenerated.
+        """
+        if level is not None:
+            difficulty_level, seed = level.difficulty, level.seed
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.level_seed = seed
+        logger.info("Starting new game at difficulty level %s (seed %s)", difficulty_level, seed)
         
         # If no difficulty level is specified, use the last selected or default to 2
         if difficulty_level is None:
@@ -67,47 +130,89 @@ class Game:
         global STARTING_RESOURCES
         STARTING_RESOURCES = level_config['starting_resources']
 
-        # Clear existing sprites
+        # Return the previous level's sprites to the pools and drop its journal, then clear the rest
+        if self.grid:
+            self.grid.release()
         self.all_sprites.empty()
-        self.tiles.empty()
         self.infrastructure.empty()
         self.ui_elements.empty()
         
         # Create grid with current difficulty settings
-        self.grid = Grid(self, GRID_WIDTH, GRID_HEIGHT)
-        
-        # Place houses based on difficulty level
-        self.grid.place_houses(level_config['house_count'])
+        if level is None:
+            grid_width, grid_height = level_config.get('grid_size', (GRID_WIDTH, GRID_HEIGHT))
+            self.grid = Grid(self, grid_width, grid_height, seed=seed)
+            
+            # Place houses based on difficulty level
+            self.grid.place_houses(level_config['house_count'])
+        else:
+            self.grid = Grid(self, level.width, level.height, level.river_path)
+            for x, y in level.houses:
+                self.grid.place_house(self.grid.get_tile(x, y))
         
         # Initialize other game components
-        self.water_sim = WaterSimulation(self, self.grid)
+        animate = ANIMATE_FLOOD and not self.timestep.headless
+        self.water_sim = WaterSimulation(self, self.grid, self.flood_executor, animate)
+        self.command_log = CommandLog(self)
         self.resources = STARTING_RESOURCES
         self.state = PLANNING
         
-        # Reinitialize mouse controller and toolbar
-        self.mouse_controller = MouseController(self)
+        # Reset mouse controller and toolbar, reusing their sprites
+        self.mouse_controller.reset()
         
-        print(f"Game state changed to: {self.state}")
+        log.events.record(log.EVENT_LEVEL_START, self.current_difficulty, seed & 0x7fffffff)
+        logger.info("Game state changed to: %s", self.state)
+
+    def retry_level(self):
+        """Replay the current level with the same map and infrastructure"""
+        self.water_sim.reset_all_flooding()
+        self.state = PLANNING
+        logger.info("Retrying level, game state changed to: %s", self.state)
 
     def update(self):
-        """Update game state"""
+        """Update game state once per frame, running the simulation ticks due since the last one"""
+        if self.state == LOADING:
+            self.loader.step()
+            return
+        
         # Update music based on current game state
         self.sound_manager.update_music(self.state)
         
-        self.game_loop.update()
-        self.all_sprites.update()
+        state = self.state
+        ticks = 0
+        if state == WEATHER:
+            self.water_sim.begin_frame()  # One flood budget however many ticks run
+        for _ in range(self.timestep.ticks(self.dt)):
+            self.tick()
+            ticks += 1
+            if self.state != state:
+                break  # Show the new phase before simulating any further
+        if state == WEATHER:
+            self.water_sim.end_frame()
+        self.total_ticks += ticks
+        self.instrumentation.count("ticks", ticks)
+        self.instrumentation.count("sprite updates", self.scheduler.run())
+        
+        if self.state in PLAY_STATES:
+            self.grid.camera.update(self.dt)
         
         if self.state == PLANNING:
             self.mouse_controller.update()
-        elif self.state == WEATHER:
+        elif self.state == WEATHER and not self.timestep.headless:
             self.rain_effect.update()
             self.water_overlay.update()
 
+    def tick(self):
+        """Advance the simulation by one fixed timestep"""
+        self.game_loop.update()
+
     def events(self):
         for event in pg.event.get():
             if event.type == pg.QUIT:
                 self.running = False
             
+            if self.state == LOADING:
+                continue  # Nothing else is ready to handle input yet
+            
             if event.type == pg.MOUSEBUTTONDOWN:
                 # Handle menu clicks
                 if self.state == MENU:
@@ -115,50 +220,77 @@ class Game:
                 elif self.state == PLANNING:
                     self.mouse_controller.handle_click(event.pos, event.button)
             
+            if event.type == pg.MOUSEWHEEL and self.state in PLAY_STATES:
+                # Zoom around the mouse cursor
+                self.grid.camera.zoom_at(ZOOM_STEP ** event.y, pg.mouse.get_pos())
+            
             if event.type == pg.MOUSEBUTTONUP and self.state == PLANNING:
                 self.mouse_controller.handle_release()
             
             if event.type == pg.KEYDOWN:
-                print(f"Key pressed: {event.key}")  # Debug print
+                input_log.debug("Key pressed: %s", event.key)
+                log.events.record(log.EVENT_KEY, event.key)
                 self.handle_keypress(event.key)
 
     def draw(self):
+        if self.state == LOADING:
+            self.loader.draw(self.screen)
+            pg.display.flip()
+            self.loader.frame_shown()
+            return
+        
         self.screen.fill(BLACK)  # Clear screen
         
         if self.state == MENU:
             self.ui.draw()
         else:
-            self.all_sprites.draw(self.screen)
+            # Only the tiles inside the camera view are drawn
+            self.grid.draw(self.screen)
+            self.ui_elements.draw(self.screen)
             # Draw water overlays
-        if self.state in [PLANNING, WEATHER]:
-            for sprite in self.tiles:
-                self.water_overlay.draw_water_level(sprite, self.screen)
+        if self.state in PLAY_STATES:
+            for tile, rect in self.grid.visible_tiles():
+                self.water_overlay.draw_water_level(tile, self.screen, rect)
         
         # Draw infrastructure health bars
-        for sprite in self.infrastructure:
-            # You'll want to check if this is a tree acting as a barrier
-            is_barrier_tree = (
-                sprite.infra_type == VEGETATION and 
-                self.water_sim.check_tree_barrier(sprite.tile)
-            )
-            
-            indicator = InfrastructureIndicator(sprite)
-            if is_barrier_tree:
-                # Override the color method to always return GRAY
-                indicator.get_health_color = lambda health: GRAY
-            
-            indicator.draw(self.screen)
+        if self.state != MENU:
+            for tile, rect in self.grid.visible_tiles():
+                sprite = tile.has_infrastructure and self.grid.get_infrastructure(tile)
+                if not sprite:
+                    continue
+                # Trees acting as a barrier get a gray bar
+                is_barrier_tree = (
+                    sprite.infra_type == VEGETATION and 
+                    self.water_sim.check_tree_barrier(tile)
+                )
+                sprite.indicator.draw(self.screen, rect, is_barrier_tree)
+        
+        # Hover cursor and drag preview over everything on the grid
+        if self.state == PLANNING:
+            self.mouse_controller.draw(self.screen)
         
         # Draw rain effect on top
         self.rain_effect.draw(self.screen)
         
         # Draw UI
         self.ui.draw()
+        self.instrumentation.draw(self.screen)
         
         pg.display.flip()
 
     def handle_keypress(self, key):
         """Handle keyboard input"""
+        # Debug overlay and event log dump are available in every state
+        if key == pg.K_F3:
+            self.instrumentation.toggle()
+            return
+        if key == pg.K_F4:
+            logger.info("Event log written to %s", log.events.dump("events.bin"))
+            return
+        if key == pg.K_f and self.state in PLAY_STATES:
+            logger.info("Simulation speed: x%s", self.timestep.cycle_speed())
+            return
+
         # Quit game option on main menu
         if self.state == MENU and key == pg.K_q:
             self.running = False
@@ -182,8 +314,12 @@ class Game:
                 self.new(4)  # Hard
         
         # Game over/victory screen controls
-        if self.state in [GAME_OVER, VICTORY]:
-            if key == pg.K_m:
+        if self.state in END_STATES:
+            if key == pg.K_r:
+                # Retry the level with the same layout
+                self.retry_level()
+                return
+            elif key == pg.K_m:
                 # Return to main menu
                 self.state = MENU
                 self.all_sprites.empty()
@@ -193,19 +329,38 @@ class Game:
         
         # Handle tool selection in planning phase
         if self.state == PLANNING:
-            if key == pg.K_b:  # 'b' key
-                print("B key pressed - selecting barrier")
+            if pg.key.get_mods() & pg.KMOD_CTRL:
+                self.handle_command_key(key)
+            elif key == pg.K_b:  # 'b' key
+                input_log.debug("B key pressed - selecting barrier")
                 self.mouse_controller.toolbar.select_tool(BARRIER)
             elif key == pg.K_v:  # 'v' key
-                print("V key pressed - selecting vegetation")
+                input_log.debug("V key pressed - selecting vegetation")
                 self.mouse_controller.toolbar.select_tool(VEGETATION)
             elif key == pg.K_r:  # 'r' key
-                print("R key pressed - selecting remove")
+                input_log.debug("R key pressed - selecting remove")
                 self.mouse_controller.toolbar.select_tool("remove")
 
+    def handle_command_key(self, key):
+        """Handle Ctrl shortcuts for the planning history"""
+        if key == pg.K_z:
+            self.command_log.undo()
+        elif key == pg.K_y:
+            self.command_log.redo()
+        elif key == pg.K_s:
+            path = f"solution_{self.current_difficulty}_{self.level_seed}.json"
+            self.command_log.save(path)
+            logger.info("Saved solution to %s", path)
+        elif key == pg.K_l:
+            path = f"level_{self.current_difficulty}_{self.level_seed}{level_file.LEVEL_EXTENSION}"
+            level_file.save_level(path, level_file.record_from_game(self))
+            logger.info("Saved level to %s", path)
+
     def quit(self):
         """Clean up and quit the game"""
         self.sound_manager.stop_music()
+        if self.flood_executor:
+            self.flood_executor.shutdown(wait=False, cancel_futures=True)
         pg.quit()
         sys.exit()
 
@@ -213,4 +368,5 @@ async def main():
     game = Game()
     await game.run()
 
-asyncio.run(main())
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(main())
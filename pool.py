@@ -0,0 +1,28 @@
+class SpritePool:
+    """Recycles sprites instead of constructing new ones.
+
+    Released sprites are removed from all their groups and kept; `acquire`
+    hands one back after calling its `reset` method with the same arguments
+    the factory would have received, and only builds a new sprite when the
+    pool is empty.
+    """
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, *args):
+        """Get a sprite initialized with the given arguments"""
+        if self.free:
+            sprite = self.free.pop()
+            sprite.reset(*args)
+            self.reused += 1
+            return sprite
+        self.created += 1
+        return self.factory(*args)
+
+    def release(self, sprite):
+        """Take a sprite out of play and keep it for reuse"""
+        sprite.kill()
+        self.free.append(sprite)
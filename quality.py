@@ -0,0 +1,53 @@
+from settings import *
+import log
+
+logger = log.get_logger(log.GAME)
+
+class QualityGovernor:
+    """Steps effects down when frames run over budget and back up when there is headroom.
+
+    Every QUALITY_WINDOW frames measured while playing, the 95th percentile
+    of the frames' work time (excluding the frame rate limiter's wait) is
+    compared with QUALITY_TARGET_MS: above it quality drops one of
+    QUALITY_LEVELS, below QUALITY_HEADROOM of it quality rises one. Each
+    level sets the rain intensity, whether water overlays are shaded by
+    depth, the warning flash speed and whether music plays at full quality.
+    """
+    def __init__(self, game, enabled=ADAPTIVE_QUALITY):
+        self.game = game
+        self.enabled = enabled
+        self.level = len(QUALITY_LEVELS) - 1
+        self.samples = []
+
+    def record_frame(self, work_ms):
+        """Measure a rendered frame's work time; call once per frame"""
+        if not self.enabled or self.game.state not in PLAY_STATES:
+            return
+        self.samples.append(work_ms)
+        if len(self.samples) < QUALITY_WINDOW:
+            return
+
+        samples = sorted(self.samples)
+        self.samples.clear()
+        p95 = samples[int(0.95 * (len(samples) - 1))]
+        if p95 > QUALITY_TARGET_MS and self.level > 0:
+            self.set_level(self.level - 1)
+        elif p95 < QUALITY_TARGET_MS * QUALITY_HEADROOM and self.level < len(QUALITY_LEVELS) - 1:
+            self.set_level(self.level + 1)
+        else:
+            return
+        logger.info("Quality level %s (p95 frame work %.1f ms)", self.level, p95)
+
+    def set_level(self, level):
+        """Switch to a quality level and apply its settings"""
+        self.level = level
+        self.apply()
+
+    def apply(self):
+        """Apply the current level's settings to the effects"""
+        settings = QUALITY_LEVELS[self.level]
+        self.game.rain_effect.intensity = RAIN_INTENSITY_LEVELS[settings['rain']]
+        self.game.water_overlay.depth_alpha = settings['depth_alpha']
+        self.game.water_overlay.flash_speed = settings['flash_speed']
+        if self.game.sound_manager:
+            self.game.sound_manager.high_quality = settings['music']
@@ -0,0 +1,49 @@
+import pygame as pg
+
+# How often a sprite needs its update() called
+NEVER = "never"          # Static; appearance only changes through explicit calls
+ON_CHANGE = "on_change"  # Updated on the frame after it is marked dirty
+PER_FRAME = "per_frame"  # Animated; updated every frame
+
+class UpdateScheduler:
+    """Calls update() only on the sprites that need it this frame.
+
+    Sprites join the group for their `update_frequency` through their sprite
+    groups, so killing or recycling a sprite also unregisters it. On-change
+    sprites are updated once after `mark_dirty`; static sprites are not
+    tracked at all.
+    """
+    def __init__(self):
+        self.on_change = pg.sprite.Group()
+        self.per_frame = pg.sprite.Group()
+        self.dirty = set()
+        self.updates_last_frame = 0
+
+    def group_for(self, frequency):
+        """Sprite groups a sprite with the given update frequency should join"""
+        if frequency == PER_FRAME:
+            return (self.per_frame,)
+        if frequency == ON_CHANGE:
+            return (self.on_change,)
+        return ()
+
+    def mark_dirty(self, sprite):
+        """Schedule an on-change sprite for one update"""
+        self.dirty.add(sprite)
+
+    def run(self):
+        """Update per-frame sprites and dirty on-change sprites; returns the update count"""
+        updates = 0
+        for sprite in self.per_frame.sprites():
+            sprite.update()
+            updates += 1
+
+        if self.dirty:
+            dirty, self.dirty = self.dirty, set()
+            for sprite in dirty:
+                if self.on_change.has(sprite):
+                    sprite.update()
+                    updates += 1
+
+        self.updates_last_frame = updates
+        return updates
@@ -1,3 +1,5 @@
+from enum import IntEnum
+
 # Essential game settings
 TITLE = "Flood Force"
 WIDTH = 1024  # Keep original window size
@@ -5,6 +7,23 @@ HEIGHT = 768
 FPS = 60
 TILESIZE = 40
 
+# Simulation timing
+TICK_RATE = 60                  # Simulation ticks per second at normal speed
+MAX_TICKS_PER_FRAME = 32        # Ticks run in one windowed frame at most (two frames' worth at top speed)
+HEADLESS_TICKS_PER_FRAME = 240  # Ticks run in every headless frame
+TURBO_SPEEDS = (1, 4, 16)       # Simulation speeds cycled with F while playing
+
+# Asset locations
+SOURCE_ASSET_DIR = "assets"
+OPTIMIZED_ASSET_DIR = "build/assets"   # Written by build_assets.py, used when present
+LOW_QUALITY_MUSIC_DIR = "low"          # Reduced music copies under the optimized music/
+
+# Sound settings
+MUSIC_FADE_MS = 500          # Fade-out/fade-in time when the music changes
+STINGER_MAX_BYTES = 30000    # Non-looping tracks up to this size are preloaded as sounds
+STINGER_CHANNELS = 2         # Mixer channels reserved for stingers
+PREFETCH_BLOCK_BYTES = 65536 # Music read per frame where there is no prefetch thread
+
 # Colors
 WATER_BLUE = (65, 105, 225)
 GRASS_GREEN = (34, 139, 34)
@@ -26,7 +45,35 @@ UI_WARNING = RED
 # Grid settings
 GRID_WIDTH = 20
 GRID_HEIGHT = 16
-VICTORY = "victory"
+
+# Camera settings
+CAMERA_SCROLL_SPEED = 600   # Screen pixels per second with the arrow keys
+MIN_ZOOM = 0.25
+MAX_ZOOM = 2.0
+ZOOM_STEP = 1.25            # Zoom factor per mouse wheel notch
+
+# Chunked grid storage
+CHUNK_SIZE = 32                 # Tiles per chunk side
+MAX_MATERIALIZED_CHUNKS = 64    # Chunks kept as Tile objects before the oldest is packed away
+CHUNK_RESIDENT_LIMIT = None     # Compact chunks kept in memory before spilling to disk (None = never)
+
+# Simulation
+# The flood is animated by default: with FLOOD_TICK_STEPS it spreads a tile at a time
+# across ticks (a 20x16 board's 44-92 steps take about a second at normal speed, less
+# in turbo), and it runs the same in the browser build, which has no threads
+ANIMATE_FLOOD = True            # Spread the flood over ticks so it visibly advances
+FLOOD_TICK_STEPS = 1            # Flood steps (one tile further from the river) per tick when animating
+FLOOD_FRAME_BUDGET_MS = 8       # Upper limit on flood work per frame, however many ticks it runs
+BACKGROUND_FLOOD = True         # Only with ANIMATE_FLOOD off: evaluate floods on a worker thread
+                                # (where threads exist) rather than all within one frame
+
+# Instrumentation
+FRAME_HISTORY = 120             # Frames kept for frame time statistics
+
+# Logging
+LOG_LEVEL = "warning"           # debug, info, warning or error
+LOG_CATEGORIES = None           # Set of categories to log, or None for all
+EVENT_LOG_CAPACITY = 1024       # Binary diagnostic events kept in memory (0 disables)
 
 # Weather and Flood settings
 MAX_TURNS = 20                  # More turns to give time for effects
@@ -48,25 +95,78 @@ RESOURCE_INCREASE_PER_LEVEL = 200  # Additional resources per level
 # Visual effect settings
 WATER_OPACITY = 150
 WARNING_FLASH_SPEED = 4
+DURABILITY_BUCKETS = 10      # Distinct fade/health bar steps for infrastructure
 RAIN_INTENSITY_LEVELS = {
     'light': 0.3,
     'medium': 0.6,
     'heavy': 0.9
 }
+RAIN_COLOR = (200, 200, 255)
+RAIN_DROP_SPEED = 15         # Pixels a drop falls per frame
+RAIN_MODE = "sheet"          # "sheet": scrolled pre-rendered strips; "particles": one line per drop
+RAIN_SHEET_HEIGHT = 256      # Height of the pre-rendered strips, which tile down the screen
+
+# Adaptive quality
+ADAPTIVE_QUALITY = True         # Step effects down when frames run over budget
+QUALITY_TARGET_MS = 1000 / FPS  # 95th percentile frame work time to stay under
+QUALITY_HEADROOM = 0.6          # Step back up when the 95th percentile is below this share of the target
+QUALITY_WINDOW = 60             # Frames measured before each decision
+# From lowest to highest; the game starts at the highest
+QUALITY_LEVELS = (
+    {'rain': 'light', 'depth_alpha': False, 'flash_speed': 0, 'music': False},
+    {'rain': 'medium', 'depth_alpha': False, 'flash_speed': WARNING_FLASH_SPEED // 2, 'music': True},
+    {'rain': 'heavy', 'depth_alpha': True, 'flash_speed': WARNING_FLASH_SPEED, 'music': True},
+)
+
+class _NamedIntEnum(IntEnum):
+    """Small-int enum that compares and indexes as an int but prints as its name
+
+    Game states and tile types are exclusive codes, not flags: a value is
+    exactly one member, and sets of them are tuples such as PLAY_STATES. So
+    these are IntEnums rather than IntFlags, and LAND can be 0. Where bits
+    are packed, as in a tile's state (see chunks.py), a ground type is a
+    two-bit code under TYPE_MASK next to separate flag bits.
+    """
+    def __str__(self):
+        return self.name.lower()
+
+    def __format__(self, spec):
+        return format(str(self), spec)
 
 # Game states
-MENU = "menu"
-PLANNING = "planning"
-WEATHER = "weather"
-ASSESSMENT = "assessment"
-GAME_OVER = "game_over"
-
-# Tile types
-LAND = "land"
-WATER = "water"
-BARRIER = "barrier"
-VEGETATION = "vegetation"
-RIVER_BANK = "river_bank"
+class GameState(_NamedIntEnum):
+    LOADING = 0
+    MENU = 1
+    PLANNING = 2
+    WEATHER = 3
+    ASSESSMENT = 4
+    GAME_OVER = 5
+    VICTORY = 6
+
+LOADING = GameState.LOADING
+MENU = GameState.MENU
+PLANNING = GameState.PLANNING
+WEATHER = GameState.WEATHER
+ASSESSMENT = GameState.ASSESSMENT
+GAME_OVER = GameState.GAME_OVER
+VICTORY = GameState.VICTORY
+PLAY_STATES = (PLANNING, WEATHER)
+END_STATES = (GAME_OVER, VICTORY)
+
+# Tile types; the ground types fit in two bits so they can be packed into a tile's state
+class TileType(_NamedIntEnum):
+    LAND = 0
+    WATER = 1
+    RIVER_BANK = 2
+    BARRIER = 3
+    VEGETATION = 4
+
+LAND = TileType.LAND
+WATER = TileType.WATER
+RIVER_BANK = TileType.RIVER_BANK
+BARRIER = TileType.BARRIER
+VEGETATION = TileType.VEGETATION
+GROUND_TYPES = (LAND, WATER, RIVER_BANK)
 
 # Infrastructure costs
 INFRASTRUCTURE_COSTS = {
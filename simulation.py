@@ -1,15 +1,39 @@
 import pygame as pg
+import time
 from settings import *
+from chunks import CellState
+import log
+
+logger = log.get_logger(log.SIMULATION)
 
 class WaterSimulation:
-    def __init__(self, game, grid):
+    def __init__(self, game, grid, executor=None, animate=False):
         self.game = game
         self.grid = grid
         self.game_ended = False
         self.barrier_trees = set()  # New set to track barrier trees
+        self.flooded_houses = []  # Houses reached by the flood, in flooding order
+        self.flood_snapshot = None  # Grid snapshot taken right before flooding
+        self.executor = executor  # Evaluates floods off the main thread when set
+        self.evaluation = None  # Future of the FloodPlan being evaluated
+        self.animate = animate  # Spread the flood over frames instead
+        self.flooding = None  # flood_steps() generator of the flood in progress
+        self.frame_deadline = None  # When the current frame's flood time budget runs out
 
     def process_flooding(self):
         """Process flooding from curved river outwards."""
+        for _ in self.flood_steps():
+            pass
+
+    def flood_steps(self):
+        """Flood from the curved river outwards, one step of the flood front at a time.
+        
+        Yields after each step so the flood can be spread across frames;
+        process_flooding runs it to completion at once.
+        """
+        if self.flood_snapshot is None:
+            self.flood_snapshot = self.grid.snapshot()
+        
         # Clear previous barrier trees
         self.barrier_trees.clear()
         
@@ -19,16 +43,20 @@ class WaterSimulation:
             river_center = self.grid.get_river_center(y)
             
             # Process right side - start from after river bank
-            self.flood_direction(y, range(river_center + 2, self.grid.width), "right")
+            yield from self.flood_direction(y, range(river_center + 2, self.grid.width), "right")
+            if self.flooded_houses:
+                return  # Outcome is decided as soon as a house floods
             # Process left side - start from before river bank
-            self.flood_direction(y, range(river_center - 1, -1, -1), "left")
+            yield from self.flood_direction(y, range(river_center - 1, -1, -1), "left")
+            if self.flooded_houses:
+                return
 
     def find_river_center(self, y):
         """Find the center of the river at given y coordinate."""
         # Look for middle of water tiles in this row
         water_tiles = []
         for x in range(self.grid.width):
-            if self.grid.tiles[y][x].tile_type == WATER:
+            if self.grid.get_tile(x, y).tile_type == WATER:
                 water_tiles.append(x)
         
         if water_tiles:
@@ -52,7 +80,7 @@ class WaterSimulation:
         adjacent_tree_count = sum(
             1 for x, y in adjacent_coords 
             if (0 <= x < self.grid.width and 0 <= y < self.grid.height) 
-            and self.has_tree(self.grid.tiles[y][x])
+            and self.has_tree(self.grid.get_tile(x, y))
         )
         
         # If it becomes a barrier, add to barrier trees set
@@ -63,7 +91,7 @@ class WaterSimulation:
         return is_barrier
 
     def flood_direction(self, y, x_range, direction):
-        """Handle flooding in ladder pattern with tree barrier logic."""
+        """Handle flooding in ladder pattern with tree barrier logic, yielding after each step."""
         steps_from_river = 0
         flooded_direction = set()  # Track which tiles have been flooded in this direction
         
@@ -72,10 +100,10 @@ class WaterSimulation:
             if self.has_barrier(x, y, direction):
                 return  # Still stop at barriers
             
-            tile = self.grid.tiles[y][x]
+            tile = self.grid.get_tile(x, y)
             
             # Skip original river tiles
-            if tile.tile_type == WATER and not hasattr(tile, 'was_land'):
+            if tile.tile_type == WATER and not tile.was_land:
                 continue
             
             # Check if tree acts as a barrier
@@ -83,7 +111,7 @@ class WaterSimulation:
                 return
             
             # Only process land and river bank tiles
-            if tile.tile_type in [LAND, RIVER_BANK]:
+            if tile.tile_type != WATER:
                 # Flood the current tile
                 self.flood_tile(tile)
                 flooded_direction.add((x, y))
@@ -92,7 +120,7 @@ class WaterSimulation:
                 if steps_from_river == 0:
                     adjacent_x = x - 1 if direction == "right" else x + 1
                     if 0 <= adjacent_x < self.grid.width:
-                        adjacent_tile = self.grid.tiles[y][adjacent_x]
+                        adjacent_tile = self.grid.get_tile(adjacent_x, y)
                         if not self.check_tree_barrier(adjacent_tile):
                             self.flood_tile(adjacent_tile)
                             flooded_direction.add((adjacent_x, y))
@@ -101,7 +129,11 @@ class WaterSimulation:
                 if steps_from_river > 0:
                     self.apply_vertical_spread(x, y, steps_from_river, flooded_direction, direction)
                 
+                if self.flooded_houses:
+                    return  # A house is lost, no need to keep flooding this row
+                
                 steps_from_river += 1
+                yield
 
     def apply_vertical_spread(self, x, y, distance, flooded_direction, original_direction):
         """Apply vertical flooding equally upwards and downwards."""
@@ -111,7 +143,7 @@ class WaterSimulation:
         for i in range(1, spread + 1):
             # Spread upwards
             if y - i >= 0:
-                tile = self.grid.tiles[y - i][x]
+                tile = self.grid.get_tile(x, y - i)
                 # Only spread if not already flooded in this direction and no tree barrier
                 if self.check_tree_barrier(tile):
                     break
@@ -132,26 +164,79 @@ class WaterSimulation:
                         flooded_direction.add((x, y - i))
 
     def update(self):
-        """Single evaluation when entering weather phase."""
+        """Single evaluation when entering weather phase.
+        
+        When animated, the flood advances FLOOD_TICK_STEPS a tick, up to a
+        time budget per frame however many ticks the frame runs. Otherwise,
+        with an executor, it is evaluated by a worker while frames keep running,
+        then applied to the grid within one frame once it is done.
+        """
         if self.game.state != WEATHER or self.game_ended:
             return
-            
-        # One-time flood evaluation
-        self.process_flooding()
-        self.check_game_state()
+        
+        if self.animate:
+            if self.flooding is None:
+                self.flooding = self.flood_steps()
+            if self.advance_flooding():
+                self.flooding = None
+                self.check_game_state()
+        elif self.executor is None:
+            # One-time flood evaluation
+            self.process_flooding()
+            self.check_game_state()
+        elif self.evaluation is None:
+            self.evaluation = self.executor.submit(FloodPlan(self.game, self.grid).evaluate)
+        elif self.evaluation.done():
+            plan = self.evaluation.result()
+            self.evaluation = None
+            self.apply_plan(plan)
+            self.check_game_state()
+
+    def begin_frame(self, budget_ms=FLOOD_FRAME_BUDGET_MS):
+        """Start a rendered frame's flood time budget, a cap shared by every tick of the frame."""
+        self.frame_deadline = time.perf_counter() + budget_ms / 1000
+
+    def advance_flooding(self, steps=FLOOD_TICK_STEPS):
+        """Run a tick's steps of the flood in progress, within the frame's budget; True once it has finished.
+
+        A tick run outside begin_frame gets a whole frame's budget to itself.
+        """
+        deadline = self.frame_deadline
+        if deadline is None:
+            deadline = time.perf_counter() + FLOOD_FRAME_BUDGET_MS / 1000
+        try:
+            for _ in range(steps):
+                if time.perf_counter() >= deadline:
+                    break
+                next(self.flooding)
+        except StopIteration:
+            return True
+        return False
+
+    def end_frame(self):
+        """Close the frame's flood budget."""
+        self.frame_deadline = None
+
+    def apply_plan(self, plan):
+        """Flood the tiles a finished FloodPlan flooded, in the same order."""
+        if self.flood_snapshot is None:
+            self.flood_snapshot = self.grid.snapshot()
+        self.barrier_trees = {self.grid.get_tile(cell.x, cell.y) for cell in plan.barrier_trees}
+        for x, y in plan.flooded:
+            self.flood_tile(self.grid.get_tile(x, y))
 
     def reset_all_flooding(self):
-        """Reset all flood states at the start."""
-        for y in range(self.grid.height):
-            for x in range(self.grid.width):
-                tile = self.grid.tiles[y][x]
-                if tile.tile_type == WATER and hasattr(tile, 'was_land'):
-                    tile.tile_type = tile.original_type
-                    tile.water_level = 0.0
-                    tile.update_appearance()
-        
-        # Clear barrier trees
+        """Undo the flood, touching only the cells it changed."""
+        self.evaluation = None  # Drop any flood still being evaluated
+        self.flooding = None
+        if self.flood_snapshot is not None:
+            self.grid.restore(self.flood_snapshot)
+            self.flood_snapshot = None
+        
+        # Clear barrier trees and flooded houses
         self.barrier_trees.clear()
+        self.flooded_houses.clear()
+        self.game_ended = False
 
     def has_barrier(self, x, y, direction):
         """Check for barrier protection with curved river."""
@@ -169,7 +254,7 @@ class WaterSimulation:
         if not adjacent or not adjacent.has_infrastructure:
             return False
             
-        infra = next((i for i in self.game.infrastructure if i.tile == adjacent), None)
+        infra = self.grid.get_infrastructure(adjacent)
         return infra and infra.infra_type == BARRIER
 
     def has_tree(self, tile):
@@ -177,46 +262,110 @@ class WaterSimulation:
         if not tile.has_infrastructure:
             return False
             
-        infra = next((i for i in self.game.infrastructure if i.tile == tile), None)
+        infra = self.grid.get_infrastructure(tile)
         return infra and infra.infra_type == VEGETATION
 
     def flood_tile(self, tile):
         """Convert a tile to flooded state."""
-        if tile.tile_type in [LAND, RIVER_BANK]:
-            if not hasattr(tile, 'original_type'):
-                tile.original_type = tile.tile_type
-            tile.was_land = True
-            tile.tile_type = WATER
-            tile.water_level = 1.0
+        if tile.tile_type != WATER:  # Land or river bank
+            journal = self.grid.journal
+            journal.set_attr(tile, 'state', tile.flooded_state())
+            journal.set_attr(tile, 'water_level', 1.0)
             tile.update_appearance()
+            if tile.is_house:
+                self.flooded_houses.append((tile.x, tile.y))
 
     def get_barrier_trees(self):
         """Return the set of trees acting as barriers."""
         return self.barrier_trees
 
     def check_game_state(self):
-        """Check if any houses are flooded."""
+        """Decide the outcome from the houses flooded during process_flooding."""
         if self.game_ended:
             return
             
-        houses_flooded = False
-        print("\nChecking house states:")
-        
-        for y in range(self.grid.height):
-            for x in range(self.grid.width):
-                tile = self.grid.tiles[y][x]
-                if getattr(tile, 'is_house', False):
-                    is_flooded = tile.tile_type == WATER
-                    print(f"House at ({x}, {y}): {'Flooded' if is_flooded else 'Safe'}")
-                    if is_flooded:
-                        houses_flooded = True
-                        break
-                        
-        if houses_flooded:
-            print("Game Over: House flooded!")
+        if self.flooded_houses:
+            x, y = self.flooded_houses[0]
+            logger.info("Game Over: House at (%s, %s) flooded!", x, y)
+            log.events.record(log.EVENT_HOUSE_FLOODED, x, y)
             self.game.state = GAME_OVER
         else:
-            print("Victory! All houses protected!")
+            logger.info("Victory! All %s houses protected!", len(self.grid.houses))
+            log.events.record(log.EVENT_VICTORY, len(self.grid.houses))
             self.game.state = VICTORY
             
-        self.game_ended = True
\ No newline at end of file
+        self.game_ended = True
+
+class FloodCell(CellState):
+    """A grid cell as read by a FloodView; changing it does not change the grid."""
+    __slots__ = ("x", "y", "water_level", "has_infrastructure")
+
+    def __init__(self, x, y, state, water_level, has_infrastructure):
+        self.x = x
+        self.y = y
+        self.state = state
+        self.water_level = water_level
+        self.has_infrastructure = has_infrastructure
+
+class FloodView:
+    """Copy-on-read view of a grid that a flood can be evaluated against on another thread.
+
+    Offers the parts of the Grid interface the flood uses. Chunks are copied
+    from the grid's ChunkStore the first time they are read and their cells
+    become FloodCells, so the game can keep using the grid meanwhile.
+    """
+    def __init__(self, grid):
+        self.width = grid.width
+        self.height = grid.height
+        self.river_path = grid.river_path
+        self.chunks = grid.chunks
+        self.infrastructure = dict(grid.infrastructure)  # Copied on the main thread
+        self.copies = {}  # (cx, cy) -> copied compact chunk data
+        self.cells = {}  # (x, y) -> FloodCell
+
+    def get_tile(self, x, y):
+        cell = self.cells.get((x, y))
+        if cell is None:
+            if not (0 <= x < self.width and 0 <= y < self.height):
+                return None
+            size = self.chunks.chunk_size
+            key = (x // size, y // size)
+            data = self.copies.get(key)
+            if data is None:
+                data = self.copies[key] = self.chunks.copy_chunk(key)
+            index = (y % size) * size + x % size
+            cell = FloodCell(x, y, data[index], data[self.chunks.cells + index] / 255,
+                             (x, y) in self.infrastructure)
+            self.cells[(x, y)] = cell
+        return cell
+
+    def get_river_center(self, y):
+        return self.river_path[y]
+
+    def get_infrastructure(self, tile):
+        return self.infrastructure.get((tile.x, tile.y))
+
+    def snapshot(self):
+        return None  # Nothing to roll back; the plan is applied to the real grid
+
+class FloodPlan(WaterSimulation):
+    """Evaluates a flood against a FloodView, recording the cells it floods.
+
+    WaterSimulation.apply_plan replays the recorded cells on the real grid.
+    """
+    def __init__(self, game, grid):
+        super().__init__(game, FloodView(grid))
+        self.flooded = []  # (x, y) of every flooded cell, in flooding order
+
+    def evaluate(self):
+        """Run the flood; called on the worker"""
+        self.process_flooding()
+        return self
+
+    def flood_tile(self, tile):
+        if tile.tile_type != WATER:  # Land or river bank
+            tile.state = tile.flooded_state()
+            tile.water_level = 1.0
+            self.flooded.append((tile.x, tile.y))
+            if tile.is_house:
+                self.flooded_houses.append((tile.x, tile.y))
@@ -1,69 +1,220 @@
 import pygame as pg
 import random
 import os
+import io
+import sys
+import queue
+import threading
 from settings import *
+from assets import music_path
+import log
+
+logger = log.get_logger(log.AUDIO)
 
 class SoundManager:
+    """Plays the music for each game state without stalling the frame.
+
+    Looping tracks are read into memory by a background thread before they
+    are needed (a block per frame in the browser build, which has no
+    threads) and changed with a fade-out/fade-in; short one-shot tracks
+    (stingers) are preloaded as Sounds and played on reserved channels.
+    """
     def __init__(self):
         # Initialize Pygame mixer
         pg.mixer.init()
         
         # Set up music dictionaries for different game states
         self.menu_tracks = [
-            os.path.join("assets/music", "main_menu_1.ogg"),
-            os.path.join("assets/music", "main_menu_2.ogg")
+            music_path("main_menu_1.ogg"),
+            music_path("main_menu_2.ogg")
         ]
         
         self.gameplay_tracks = [
-            os.path.join("assets/music", "gameplay_1.ogg"),
-            os.path.join("assets/music", "gameplay_2.ogg")
+            music_path("gameplay_1.ogg"),
+            music_path("gameplay_2.ogg")
         ]
         
         self.victory_tracks = [
-            os.path.join("assets/music", "victory.ogg"),
-            os.path.join("assets/music", "victory_2.ogg")
+            music_path("victory.ogg"),
+            music_path("victory_2.ogg")
         ]
         
         self.game_over_tracks = [
-            os.path.join("assets/music", "game_over_1.ogg"),
-            os.path.join("assets/music", "game_over_2.ogg")
+            music_path("game_over_1.ogg"),
+            music_path("game_over_2.ogg")
         ]
         
+        # Music likely to be wanted after each list's music
+        self.likely_next = {
+            tuple(self.menu_tracks): [self.gameplay_tracks],
+            tuple(self.gameplay_tracks): [self.menu_tracks],
+            tuple(self.victory_tracks): [self.menu_tracks, self.gameplay_tracks],
+            tuple(self.game_over_tracks): [self.menu_tracks, self.gameplay_tracks],
+        }
+        
         self.current_state = None
+        self.pending = None          # (track, loop) waiting for the fade-out to finish
+        self.music_file = None       # Keeps the in-memory track alive while it plays
+        self._high_quality = True    # Otherwise tracks start from their reduced copies, when built
+        
+        # Stingers play on their own reserved channels
+        pg.mixer.set_reserved(STINGER_CHANNELS)
+        self.stinger_channels = [pg.mixer.Channel(i) for i in range(STINGER_CHANNELS)]
+        self.stingers = {}
+        for track in self.victory_tracks + self.game_over_tracks:
+            try:
+                if os.path.getsize(track) <= STINGER_MAX_BYTES:
+                    self.stingers[track] = pg.mixer.Sound(track)
+            except Exception as e:
+                logger.error("Error loading stinger %s: %s", track, e)
         
+        # Pick each list's next track now so it can be prefetched
+        self.next_tracks = {}
+        self.prefetched = {}
+        self.prefetch_queue = queue.Queue()
+        self.reading = None  # (track, bytes read so far) when prefetching without a thread
+        self.threaded = sys.platform != "emscripten"
+        if self.threaded:
+            threading.Thread(target=self._prefetch_worker, daemon=True).start()
+        self._prefetch_next(self.menu_tracks)
+        
+    @property
+    def high_quality(self):
+        return self._high_quality
+    
+    @high_quality.setter
+    def high_quality(self, value):
+        """Switch music quality, prefetching the chosen next tracks in the new quality"""
+        if value == self._high_quality:
+            return
+        self._high_quality = value
+        for track_list in list(self.next_tracks):
+            self._prefetch_next(track_list)
+    
     def update_music(self, game_state):
-        """Update music based on game state"""
+        """Update music based on game state; call once per frame"""
         # Only change music if the state has changed
         if game_state != self.current_state:
             self.current_state = game_state
             
-            # Stop current music
-            pg.mixer.music.stop()
-            
-            # Select and play appropriate music
+            # Select appropriate music
             if game_state == MENU:
                 self._play_random_track(self.menu_tracks)
-            elif game_state in [PLANNING, WEATHER]:
+            elif game_state in PLAY_STATES:
                 self._play_random_track(self.gameplay_tracks)
             elif game_state == VICTORY:
                 self._play_random_track(self.victory_tracks, loop=False)
             elif game_state == GAME_OVER:
                 self._play_random_track(self.game_over_tracks, loop=False)
+        
+        if not self.threaded:
+            self._prefetch_step()
+        
+        # Start the next track once the old one has faded out
+        if self.pending and not pg.mixer.music.get_busy():
+            track, loop = self.pending
+            self.pending = None
+            self._start_music(track, loop)
     
     def _play_random_track(self, track_list, loop=True):
-        """Play a random track from the given list"""
-        if track_list:
-            try:
-                track = random.choice(track_list)
+        """Fade over to a random track from the given list"""
+        if not track_list:
+            return
+        track = self.next_tracks.pop(tuple(track_list), None) or random.choice(track_list)
+        for next_list in self.likely_next.get(tuple(track_list), []):
+            self._prefetch_next(next_list)
+        
+        # Fading is asynchronous; update_music starts the new track when it ends
+        pg.mixer.music.fadeout(MUSIC_FADE_MS)
+        if track in self.stingers:
+            self.pending = None
+            self._play_stinger(self.stingers[track])
+        else:
+            self.pending = (track, loop)
+    
+    def _start_music(self, track, loop):
+        """Start a music track, from memory when it has been prefetched"""
+        track = self._playback_path(track)
+        try:
+            data = self.prefetched.get(track)
+            if data is not None:
+                self.music_file = io.BytesIO(data)
+                pg.mixer.music.load(self.music_file, "ogg")
+            else:
                 pg.mixer.music.load(track)
-                pg.mixer.music.play(-1 if loop else 0)  # -1 for loop, 0 for once
-            except Exception as e:
-                print(f"Error playing music track: {e}")
+            pg.mixer.music.play(-1 if loop else 0, fade_ms=MUSIC_FADE_MS)  # -1 for loop, 0 for once
+        except Exception as e:
+            logger.error("Error playing music track %s: %s", track, e)
+    
+    def _playback_path(self, track):
+        """File actually played for a track: its reduced copy while quality is turned down"""
+        if self.high_quality:
+            return track
+        return music_path(os.path.basename(track), low_quality=True)
+    
+    def _play_stinger(self, sound):
+        """Play a stinger on a free reserved channel, or the first one if all are busy"""
+        channel = next((c for c in self.stinger_channels if not c.get_busy()), self.stinger_channels[0])
+        channel.play(sound)
+    
+    def _prefetch_next(self, track_list):
+        """Choose the next track of a list and read it in the background"""
+        track = self.next_tracks.get(tuple(track_list))
+        if track is None:
+            track = random.choice(track_list)
+            self.next_tracks[tuple(track_list)] = track
+        if track not in self.stingers:
+            path = self._playback_path(track)
+            if path not in self.prefetched:
+                self.prefetch_queue.put(path)
+    
+    def _prefetch_worker(self):
+        """Read queued tracks into memory"""
+        while True:
+            track = self.prefetch_queue.get()
+            if track in self.prefetched:
+                continue
+            try:
+                with open(track, "rb") as f:
+                    self.prefetched[track] = f.read()
+            except OSError as e:
+                logger.error("Error prefetching music track: %s", e)
+    
+    def _prefetch_step(self):
+        """Read the next block of the queued tracks, for builds without a prefetch thread"""
+        if self.reading is None:
+            try:
+                track = self.prefetch_queue.get_nowait()
+            except queue.Empty:
+                return
+            if track in self.prefetched:
+                return
+            self.reading = (track, bytearray())
+        
+        track, data = self.reading
+        try:
+            with open(track, "rb") as f:
+                f.seek(len(data))
+                block = f.read(PREFETCH_BLOCK_BYTES)
+        except OSError as e:
+            logger.error("Error prefetching music track: %s", e)
+            self.reading = None
+            return
+        if block:
+            data += block
+        else:
+            self.prefetched[track] = bytes(data)
+            self.reading = None
     
     def stop_music(self):
         """Stop all music playback"""
+        self.pending = None
         pg.mixer.music.stop()
+        for channel in self.stinger_channels:
+            channel.stop()
     
     def set_volume(self, volume=0.5):
         """Set music volume (0.0 to 1.0)"""
-        pg.mixer.music.set_volume(volume)
\ No newline at end of file
+        pg.mixer.music.set_volume(volume)
+        for sound in self.stingers.values():
+            sound.set_volume(volume)
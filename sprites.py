@@ -1,32 +1,68 @@
 import pygame as pg
 from settings import *
+from scheduler import NEVER, ON_CHANGE
+from weather_effects import InfrastructureIndicator
+from assets import load_image
+from chunks import CellState
+import math
 import os
+import log
+
+logger = log.get_logger(log.GAME)
+
+class Tile(CellState):
+    """One grid cell, with fixed slots instead of a per-tile __dict__.
+
+    The type, house flag and flood history are packed into the integer
+    `state` (see CellState). Tiles are drawn by the grid, so they belong
+    to no sprite groups.
+    """
+    __slots__ = ("x", "y", "water_level", "elevation", "has_infrastructure",
+                 "image", "view_image", "view_source")
+    # Images shared by every tile, loaded on first use
+    shared_images = None
+    house_image = None
+    # Redrawn through update_appearance() whenever its state changes
+    update_frequency = NEVER
 
-class Tile(pg.sprite.Sprite):
     def __init__(self, game, x, y, tile_type):
-        self._layer = 0
-        self.groups = game.all_sprites, game.tiles
-        pg.sprite.Sprite.__init__(self, self.groups)
-        self.game = game
+        Tile.preload_images()
+        self.reset(x, y, tile_type)
+
+    def reset(self, x, y, tile_type):
+        """Put the tile into its initial state at a new position (used when recycling)."""
         self.x = x
         self.y = y
-        self.tile_type = tile_type
+        self.state = tile_type
         self.water_level = 0
         self.elevation = 0
         self.has_infrastructure = False
-        self.highlighted = False
-        self.is_house = False
+        self.image = Tile.shared_images[tile_type]
         
-        # Store images for different states
-        self.images = self.load_tile_images()
-        self.image = self.images[self.tile_type]
-        self.rect = self.image.get_rect()
-        self.rect.x = x * TILESIZE
-        self.rect.y = y * TILESIZE
+        # Zoomed copy of the image, rebuilt by the camera when needed
+        self.view_image = None
+        self.view_source = None
         
         self.initialize_tile()
 
-    def load_tile_images(self):
+    def kill(self):
+        """Tiles are in no groups; this lets the sprite pool recycle them like sprites."""
+
+    @property
+    def rect(self):
+        """The tile's area in world pixels"""
+        return pg.Rect(self.x * TILESIZE, self.y * TILESIZE, TILESIZE, TILESIZE)
+
+    @classmethod
+    def preload_images(cls):
+        """Load the shared tile and house images if they are not loaded yet."""
+        if cls.shared_images is None:
+            cls.shared_images = cls.load_tile_images()
+        cls.load_house_image()
+        return cls.shared_images
+
+    @classmethod
+    def load_tile_images(cls):
         """Load all possible tile images."""
         images = {}
         image_types = {
@@ -36,18 +72,17 @@ class Tile(pg.sprite.Sprite):
         }
         
         for tile_type, image_name in image_types.items():
-            image_path = os.path.join("assets/resources", image_name)
             try:
-                image = pg.image.load(image_path).convert_alpha()
-                images[tile_type] = pg.transform.scale(image, (TILESIZE, TILESIZE))
+                images[tile_type] = load_image(image_name, (TILESIZE, TILESIZE))
             except:
-                print(f"Failed to load image: {image_path}")
+                logger.error("Failed to load image: %s", image_name)
                 surface = pg.Surface((TILESIZE, TILESIZE))
-                surface.fill(self.get_default_color(tile_type))
+                surface.fill(cls.get_default_color(tile_type))
                 images[tile_type] = surface
         return images
 
-    def get_default_color(self, tile_type):
+    @staticmethod
+    def get_default_color(tile_type):
         """Get default color for fallback rendering."""
         if tile_type == LAND:
             return GRASS_GREEN
@@ -57,6 +92,21 @@ class Tile(pg.sprite.Sprite):
             return (139, 69, 19)  # Brown
         return GRAY
 
+    @classmethod
+    def load_house_image(cls):
+        """Load the house image once and share it between tiles."""
+        if cls.house_image is None:
+            try:
+                cls.house_image = load_image("house.png", (TILESIZE-10, TILESIZE-10))
+            except:
+                house_image = pg.Surface((TILESIZE-10, TILESIZE-10), pg.SRCALPHA)
+                house_rect = pg.Rect(5, 5, TILESIZE-20, TILESIZE-20)
+                pg.draw.rect(house_image, (139, 69, 19), house_rect)
+                roof_points = [(0, 15), (TILESIZE//2 - 5, 0), (TILESIZE-10, 15)]
+                pg.draw.polygon(house_image, (165, 42, 42), roof_points)
+                cls.house_image = house_image
+        return cls.house_image
+
     def initialize_tile(self):
         """Initialize tile properties."""
         if self.tile_type == LAND:
@@ -71,75 +121,114 @@ class Tile(pg.sprite.Sprite):
 
     def update_appearance(self):
         """Update tile appearance based on current state."""
+        images = Tile.shared_images
+        flooded = self.water_level > 0 and self.tile_type != WATER
+        
+        # Plain tiles share their type's image instead of keeping a copy
+        if not (flooded or self.is_house or self.has_infrastructure):
+            self.image = images[self.tile_type]
+            return
+        
         # Use the appropriate base image for current tile type
-        self.image = self.images[self.tile_type].copy()
+        self.image = images[self.tile_type].copy()
         
         # Add water overlay for flooding
-        if self.water_level > 0 and self.tile_type != WATER:
-            water_overlay = self.images[WATER].copy()
+        if flooded:
+            water_overlay = images[WATER].copy()
             water_overlay.set_alpha(int(self.water_level * 255))
             self.image.blit(water_overlay, (0, 0))
         
         # Add house if present
         if self.is_house:
-            try:
-                house_image = pg.image.load(os.path.join("assets/resources", "house.png")).convert_alpha()
-                house_image = pg.transform.scale(house_image, (TILESIZE-10, TILESIZE-10))
-                self.image.blit(house_image, (5, 5))
-            except:
-                house_rect = pg.Rect(10, 10, TILESIZE-20, TILESIZE-20)
-                pg.draw.rect(self.image, (139, 69, 19), house_rect)
-                roof_points = [(5, 20), (TILESIZE//2, 5), (TILESIZE-5, 20)]
-                pg.draw.polygon(self.image, (165, 42, 42), roof_points)
+            self.image.blit(self.load_house_image(), (5, 5))
         
         # Show infrastructure
         if self.has_infrastructure:
             pg.draw.rect(self.image, (100, 100, 100), 
                         self.rect.inflate(-10, -10), 2)
-        
-        # Show selection highlight
-        if self.highlighted:
-            highlight_surf = pg.Surface((TILESIZE, TILESIZE), pg.SRCALPHA)
-            pg.draw.rect(highlight_surf, (255, 255, 255, 100), 
-                        highlight_surf.get_rect())
-            self.image.blit(highlight_surf, (0, 0))
 
 class Infrastructure(pg.sprite.Sprite):
+    # Base images per infrastructure type, loaded on first use
+    type_images = {}
+    # Faded images per (type, durability bucket), shared by all infrastructure
+    durability_images = {}
+    # Updated only after its durability changes
+    update_frequency = ON_CHANGE
+
     def __init__(self, game, tile, infra_type):
         self._layer = 1
-        self.groups = game.all_sprites, game.infrastructure
+        self.groups = (game.all_sprites, game.infrastructure,
+                       *game.scheduler.group_for(self.update_frequency))
         pg.sprite.Sprite.__init__(self, self.groups)
         self.game = game
-        self.tile = tile
+        self.rect = pg.Rect(0, 0, TILESIZE, TILESIZE)
+        self.indicator = InfrastructureIndicator(self)
+        self.reset(tile, infra_type)
+
+    def reset(self, tile, infra_type):
+        """Place the infrastructure fresh on a tile (used when recycling)."""
+        if not self.alive():
+            self.add(self.groups)
+        self.x = tile.x
+        self.y = tile.y
         self.infra_type = infra_type
         self.durability = 100
         self.efficiency = 1.0
         
         # Load image based on type
         self.base_image = self.load_infra_image()
-        self.image = self.base_image.copy()
-        self.rect = self.image.get_rect()
-        self.rect.topleft = self.tile.rect.topleft
+        self.bucket = None
+        self.update_appearance()
+        self.rect.topleft = tile.rect.topleft
+        self.view_image = None
+        self.view_source = None
         
-        self.tile.has_infrastructure = True
+        tile.has_infrastructure = True
+
+    @property
+    def durability(self):
+        return self._durability
+
+    @durability.setter
+    def durability(self, value):
+        self._durability = value
+        self.game.scheduler.mark_dirty(self)
+
+    @property
+    def tile(self):
+        """The tile this infrastructure stands on (looked up, since tiles can be rebuilt)."""
+        return self.game.grid.get_tile(self.x, self.y)
 
     def load_infra_image(self):
+        """Get the shared infrastructure image for this type."""
+        if self.infra_type not in Infrastructure.type_images:
+            Infrastructure.type_images[self.infra_type] = self.create_infra_image(self.infra_type)
+        return Infrastructure.type_images[self.infra_type]
+
+    @classmethod
+    def preload_images(cls):
+        """Load the shared images of every infrastructure type."""
+        for infra_type in INFRASTRUCTURE_COSTS:
+            if infra_type not in cls.type_images:
+                cls.type_images[infra_type] = cls.create_infra_image(infra_type)
+
+    @staticmethod
+    def create_infra_image(infra_type):
         """Load infrastructure image based on type."""
         image_name = ""
-        if self.infra_type == BARRIER:
+        if infra_type == BARRIER:
             image_name = "barrier.png"
-        elif self.infra_type == VEGETATION:
+        elif infra_type == VEGETATION:
             image_name = "vegetation.png"
             
         try:
-            image = pg.image.load(os.path.join("assets/resources", image_name)).convert_alpha()
-            return pg.transform.scale(image, (TILESIZE, TILESIZE))
+            return load_image(image_name, (TILESIZE, TILESIZE))
         except:
             surface = pg.Surface((TILESIZE, TILESIZE), pg.SRCALPHA)
-            if self.infra_type == BARRIER:
+            if infra_type == BARRIER:
                 surface.fill((150, 150, 150))
                 pg.draw.rect(surface, (100, 100, 100), surface.get_rect(), 4)
-            elif self.infra_type == VEGETATION:
+            elif infra_type == VEGETATION:
                 surface.fill((0, 100, 0))
                 pg.draw.polygon(surface, (34, 139, 34), [
                     (TILESIZE//2, 5),
@@ -156,12 +245,24 @@ class Infrastructure(pg.sprite.Sprite):
             self.destroy()
         self.update_appearance()
 
+    def durability_bucket(self):
+        """Durability rounded up to one of DURABILITY_BUCKETS steps."""
+        return math.ceil(max(0, self.durability) * DURABILITY_BUCKETS / 100)
+
     def update_appearance(self):
-        """Update visual appearance based on durability."""
-        self.image = self.base_image.copy()
-        self.image.set_alpha(int(255 * (self.durability / 100)))
+        """Switch to the cached image for the current durability bucket."""
+        bucket = self.durability_bucket()
+        if bucket == self.bucket:
+            return
+        self.bucket = bucket
+        
+        key = (self.infra_type, bucket)
+        if key not in Infrastructure.durability_images:
+            image = self.base_image.copy()
+            image.set_alpha(int(255 * bucket / DURABILITY_BUCKETS))
+            Infrastructure.durability_images[key] = image
+        self.image = Infrastructure.durability_images[key]
 
     def destroy(self):
         """Remove the infrastructure."""
-        self.tile.has_infrastructure = False
-        self.kill()
\ No newline at end of file
+        self.game.grid.remove_infrastructure(self.tile)
\ No newline at end of file
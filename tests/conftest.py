@@ -0,0 +1,29 @@
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from level_file import start_headless_game
+from chunks import ChunkStore
+
+@pytest.fixture(scope="session")
+def game():
+    """A headless game past its startup loader, shared by the whole run"""
+    return start_headless_game()
+
+@pytest.fixture
+def level(game):
+    """The shared game set up on a fresh, fixed level"""
+    game.new(2, seed=1234)
+    return game
+
+@pytest.fixture
+def grid(level):
+    """The level's grid restored into small chunks, one materialized at a time"""
+    grid = level.grid
+    grid.release()
+    grid.chunks = ChunkStore(grid, chunk_size=4, max_materialized=1)
+    return grid
@@ -0,0 +1,47 @@
+from settings import *
+
+def test_evicted_chunk_keeps_its_tiles_state(grid):
+    chunks = grid.chunks
+    tile = grid.get_tile(0, 0)
+    tile.is_house = True
+    tile.state = tile.flooded_state()
+    tile.water_level = 0.5
+
+    grid.get_tile(chunks.chunk_size, 0)  # Materializing another chunk evicts the first
+    assert (0, 0) not in chunks.materialized
+
+    tile = grid.get_tile(0, 0)
+    assert (0, 0) in chunks.materialized
+    assert tile.tile_type == WATER
+    assert tile.original_type == LAND
+    assert tile.is_house and tile.was_land
+    assert abs(tile.water_level - 0.5) <= 1 / 255
+
+def test_materialized_chunks_stay_within_the_limit(grid):
+    chunks = grid.chunks
+    chunks.max_materialized = 2
+    for x in range(0, grid.width, chunks.chunk_size):
+        for y in range(0, grid.height, chunks.chunk_size):
+            grid.get_tile(x, y)
+    assert len(chunks.materialized) <= 2
+
+def test_spilled_chunk_is_read_back(grid):
+    chunks = grid.chunks
+    chunks.resident_limit = 1
+    tile = grid.get_tile(0, 0)
+    tile.water_level = 0.25
+    grid.get_tile(chunks.chunk_size, 0)
+    grid.get_tile(0, chunks.chunk_size)
+    assert (0, 0) in chunks.spilled
+
+    assert abs(grid.get_tile(0, 0).water_level - 0.25) <= 1 / 255
+    assert (0, 0) not in chunks.spilled
+
+def test_copy_chunk_includes_materialized_changes(grid):
+    chunks = grid.chunks
+    tile = grid.get_tile(1, 1)
+    tile.water_level = 1.0
+    data = chunks.copy_chunk((0, 0))
+    index = chunks.chunk_size + 1
+    assert data[index] == tile.state
+    assert data[chunks.cells + index] == 255
@@ -0,0 +1,64 @@
+from settings import *
+
+def land_tiles(game, count):
+    """Tiles of the leftmost columns that can take infrastructure"""
+    grid = game.grid
+    tiles = [grid.get_tile(x, y) for x in range(2) for y in range(grid.height)]
+    return [tile for tile in tiles if tile.tile_type == LAND and not tile.is_house][:count]
+
+def layout(game):
+    return {cell: infra.infra_type for cell, infra in game.grid.infrastructure.items()}
+
+def test_multi_command_step_undoes_and_redoes_together(level):
+    log = level.command_log
+    start = level.resources
+    tiles = land_tiles(level, 3)
+    assert log.place_all(tiles, VEGETATION) == 3
+    placed = layout(level)
+    assert len(log.done) == 1
+    assert level.resources == start - 3 * INFRASTRUCTURE_COSTS[VEGETATION]
+
+    assert log.undo()
+    assert layout(level) == {}
+    assert level.resources == start
+
+    assert log.redo()
+    assert layout(level) == placed
+    assert level.resources == start - 3 * INFRASTRUCTURE_COSTS[VEGETATION]
+
+def test_remove_step_refunds_and_undoes(level):
+    log = level.command_log
+    tiles = land_tiles(level, 2)
+    log.place_all(tiles, BARRIER)
+    after_place = level.resources
+    placed = layout(level)
+
+    assert log.remove_all(tiles) == 2
+    assert layout(level) == {}
+    assert level.resources == after_place + INFRASTRUCTURE_COSTS[BARRIER]
+
+    log.undo()
+    assert layout(level) == placed
+    assert level.resources == after_place
+
+def test_place_all_stops_when_the_budget_runs_out(level):
+    cost = INFRASTRUCTURE_COSTS[BARRIER]
+    level.resources = 2 * cost + cost // 2
+    assert level.command_log.place_all(land_tiles(level, 4), BARRIER) == 2
+    assert level.resources == cost // 2
+
+def test_new_step_discards_redo(level):
+    log = level.command_log
+    first, second = land_tiles(level, 2)
+    log.place(first, BARRIER)
+    log.undo()
+    log.place(second, VEGETATION)
+    assert not log.redo()
+    assert layout(level) == {(second.x, second.y): VEGETATION}
+
+def test_solution_lists_every_command_of_every_step(level):
+    log = level.command_log
+    tiles = land_tiles(level, 3)
+    log.place_all(tiles[:2], BARRIER)
+    log.place(tiles[2], VEGETATION)
+    assert len(log.to_solution()["commands"]) == 3
@@ -0,0 +1,78 @@
+from settings import *
+
+def cell_states(game):
+    grid = game.grid
+    return {(x, y): (grid.get_tile(x, y).state, grid.get_tile(x, y).water_level)
+            for y in range(grid.height) for x in range(grid.width)}
+
+def flood(game):
+    game.state = WEATHER
+    game.water_sim.process_flooding()
+
+def test_reset_undoes_the_flood(level):
+    before = cell_states(level)
+    flood(level)
+    assert cell_states(level) != before
+    level.water_sim.reset_all_flooding()
+    assert cell_states(level) == before
+    assert not level.water_sim.flooded_houses
+
+def test_retry_replays_the_same_flood(level):
+    flood(level)
+    flooded = cell_states(level)
+    level.retry_level()
+    assert level.state == PLANNING
+    flood(level)
+    assert cell_states(level) == flooded
+
+def test_restore_returns_to_a_snapshot(level):
+    grid = level.grid
+    tile = grid.get_tile(0, 0)
+    snapshot = grid.snapshot()
+    grid.journal.set_attr(tile, 'water_level', 0.5)
+    grid.place_infrastructure(grid.get_tile(1, 0), BARRIER)
+    grid.restore(snapshot)
+    assert tile.water_level == 0
+    assert (1, 0) not in grid.infrastructure
+
+def test_rollback_across_more_chunks_than_stay_materialized(grid):
+    chunks = grid.chunks
+    chunks.max_materialized = grid.width // chunks.chunk_size  # One row of chunks
+    chunk_count = len(range(0, grid.width, chunks.chunk_size)) * len(range(0, grid.height, chunks.chunk_size))
+    cells = [(x, y) for y in range(grid.height) for x in range(grid.width)]
+    before = [grid.get_tile(*cell).water_level for cell in cells]
+    snapshot = grid.snapshot()
+    for cell in cells:
+        grid.journal.set_attr(grid.get_tile(*cell), 'water_level', 0.5)
+
+    built = []
+    materialize = chunks.materialize
+    chunks.materialize = lambda key: built.append(key) or materialize(key)
+    grid.restore(snapshot)
+    assert len(built) <= 2 * chunk_count
+    assert [grid.get_tile(*cell).water_level for cell in cells] == before
+
+def test_planning_edits_are_not_journaled(level):
+    grid = level.grid
+    pool = level.infrastructure_pool
+    tile = grid.get_tile(0, 0)
+    level.command_log.place(tile, BARRIER)
+    free = len(pool.free)
+    level.command_log.remove(tile)
+    assert grid.journal.entries == []
+    assert len(pool.free) == free + 1  # The removed barrier is back in the pool
+
+def test_journal_stops_recording_after_a_reset(level):
+    flood(level)
+    assert level.grid.journal.entries
+    level.water_sim.reset_all_flooding()
+    assert level.grid.journal.entries == []
+    assert not level.grid.journal.recording
+
+def test_restored_infrastructure_rejoins_all_its_groups(level):
+    grid = level.grid
+    infra = grid.place_infrastructure(grid.get_tile(0, 0), BARRIER)
+    snapshot = grid.snapshot()
+    grid.remove_infrastructure(infra.tile)
+    grid.restore(snapshot)
+    assert all(infra in group for group in infra.groups)
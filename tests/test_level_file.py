@@ -0,0 +1,58 @@
+import pytest
+from settings import *
+from level_file import (LevelCollection, LevelRecord, pack_layout, pack_level, read_level,
+                        record_from_game, save_level, unpack_layout, unpack_level, write_collection)
+
+def make_level(seed=7, outcome=None):
+    layout = {(0, 0): BARRIER, (3, 1): VEGETATION, (4, 2): BARRIER}
+    return LevelRecord(difficulty=2, seed=seed, width=5, height=3, river_path=(2, 2, 1),
+                       houses=((0, 2), (4, 0)), layout=layout, outcome=outcome)
+
+def test_layout_round_trip():
+    layout = make_level().layout
+    assert unpack_layout(pack_layout(layout, 5, 3), 5) == layout
+
+def test_layout_packs_four_cells_per_byte():
+    assert len(pack_layout({}, 5, 3)) == 4
+
+@pytest.mark.parametrize("outcome", [None, GAME_OVER, VICTORY])
+def test_level_round_trip(outcome):
+    level = make_level(outcome=outcome)
+    assert unpack_level(pack_level(level)) == level
+
+def test_level_seed_is_kept_to_32_bits():
+    assert unpack_level(pack_level(make_level(seed=2**32 + 5))).seed == 5
+
+def test_unpack_level_rejects_other_data():
+    with pytest.raises(ValueError):
+        unpack_level(b"XXXX" + bytes(pack_level(make_level()))[4:])
+
+def test_save_and_read_level(tmp_path):
+    path = tmp_path / "level.flv"
+    save_level(path, make_level())
+    assert read_level(path) == make_level()
+
+def test_record_from_game_round_trip(level):
+    level.command_log.place_all([level.grid.get_tile(0, y) for y in range(3)
+                                 if not level.grid.get_tile(0, y).is_house], BARRIER)
+    record = record_from_game(level)
+    assert record.layout
+    assert unpack_level(pack_level(record)) == record
+
+def test_collection_round_trip(tmp_path):
+    levels = [make_level(seed, outcome) for seed, outcome in
+              ((1, VICTORY), (2, GAME_OVER), (3, None))]
+    path = tmp_path / "levels.flc"
+    write_collection(path, levels)
+    with LevelCollection(path) as collection:
+        assert len(collection) == 3
+        assert [collection[i] for i in range(3)] == levels
+        assert collection[-1] == levels[-1]
+        with pytest.raises(IndexError):
+            collection[3]
+
+def test_collection_rejects_a_level_file(tmp_path):
+    path = tmp_path / "level.flv"
+    save_level(path, make_level())
+    with pytest.raises(ValueError):
+        LevelCollection(path)
@@ -0,0 +1,42 @@
+from settings import *
+
+class FixedTimestep:
+    """Turns real frame time into a whole number of fixed-length simulation ticks.
+
+    Each frame passes the real time it took to `ticks()`, which returns how
+    many ticks are due: TICK_RATE per second at speed 1, proportionally more
+    at higher speeds, so many ticks can run per rendered frame. Time left
+    over carries into the next frame. At most `max_ticks` run per frame; a
+    larger backlog is dropped so one slow frame cannot snowball. A headless
+    timestep does not render and does not wait for real time, so every
+    frame runs `max_ticks` ticks, HEADLESS_TICKS_PER_FRAME by default.
+    """
+    def __init__(self, speed=1, headless=False, tick_rate=TICK_RATE, max_ticks=None):
+        self.tick_time = 1 / tick_rate
+        self.speed = speed
+        self.headless = headless
+        if max_ticks is None:
+            max_ticks = HEADLESS_TICKS_PER_FRAME if headless else MAX_TICKS_PER_FRAME
+        self.max_ticks = max_ticks
+        self.accumulated = 0.0
+
+    def ticks(self, dt):
+        """Number of ticks to run for a frame that took dt seconds"""
+        if self.headless:
+            count = self.max_ticks
+        else:
+            self.accumulated += dt * self.speed
+            count = int(self.accumulated / self.tick_time)
+            if count > self.max_ticks:
+                count = self.max_ticks
+                self.accumulated = 0.0
+            else:
+                self.accumulated -= count * self.tick_time
+        return count
+
+    def cycle_speed(self, speeds=TURBO_SPEEDS):
+        """Switch to the next of the turbo speeds; returns the new speed"""
+        index = speeds.index(self.speed) + 1 if self.speed in speeds else 0
+        self.speed = speeds[index % len(speeds)]
+        self.accumulated = 0.0
+        return self.speed
@@ -1,10 +1,7 @@
 import pygame as pg
 import os
 from settings import *
-
-import pygame as pg
-import os
-from settings import *
+from assets import load_image, fit_size
 
 class UI:
     def __init__(self, game):
@@ -13,24 +10,21 @@ class UI:
         self.font_med = pg.font.Font(None, 32)
         self.font_small = pg.font.Font(None, 24)
         self.menu_buttons = []
-        # Load start screen
+        # The start screen is loaded later by the startup loader
+        self.start_screen = None
+        self.start_screen_x = 0
+        self.start_screen_y = 0
+
+    def load_start_screen(self):
+        """Load and scale the start screen image"""
         try:
-            original_image = pg.image.load(os.path.join("assets/resources", "start_screen.png")).convert_alpha()
-            
-            # Calculate scaling while preserving aspect ratio
-            image_ratio = original_image.get_width() / original_image.get_height()
-            screen_ratio = WIDTH / HEIGHT
-            
-            if screen_ratio > image_ratio:
-                # Screen is wider than image - fit to height
-                new_height = HEIGHT
-                new_width = int(HEIGHT * image_ratio)
+            # Already the right size when built by build_assets.py
+            original_image = load_image("start_screen.png")
+            new_width, new_height = fit_size(original_image.get_size())
+            if original_image.get_size() == (new_width, new_height):
+                self.start_screen = original_image
             else:
-                # Screen is taller than image - fit to width
-                new_width = WIDTH
-                new_height = int(WIDTH / image_ratio)
-                
-            self.start_screen = pg.transform.scale(original_image, (new_width, new_height))
+                self.start_screen = pg.transform.scale(original_image, (new_width, new_height))
             
             # Calculate position to center the image
             self.start_screen_x = (WIDTH - new_width) // 2
@@ -39,8 +33,6 @@ class UI:
         except Exception as e:
             print(f"Failed to load start screen image: {e}")
             self.start_screen = None
-            self.start_screen_x = 0
-            self.start_screen_y = 0
         
     def draw_menu(self):
         """Draw the main menu screen with clickable buttons"""
@@ -107,7 +99,7 @@ class UI:
         
         if current_state == MENU:
             self.draw_menu()
-        elif current_state in [PLANNING, WEATHER]:
+        elif current_state in PLAY_STATES:
             self.draw_game_ui()
         elif current_state == GAME_OVER:
             self.draw_game_over()
@@ -122,7 +114,11 @@ class UI:
         self.game.screen.blit(resource_text, (WIDTH - text_width - 20, 10))  # 20px padding from right edge
 
         # Current phase
-        phase_text = self.font_med.render(f"Phase: {self.game.state.title()}", True, WHITE)
+        phase = self.game.state.name.title()
+        speed = self.game.timestep.speed
+        if speed > 1:
+            phase += f" x{speed}"
+        phase_text = self.font_med.render(f"Phase: {phase}", True, WHITE)
         phase_width = phase_text.get_width()
         self.game.screen.blit(phase_text, (WIDTH - phase_width - 20, 50))  # Below resource text
 
@@ -137,6 +133,8 @@ class UI:
             "B - Barrier ($100)",
             "V - Vegetation ($50)",
             "R - Remove",
+            "Ctrl+Z/Y - Undo/Redo",
+            "Arrows/Wheel - Scroll/Zoom",
             "SPACE - Start Storm"
         ]
         # Keep controls panel on right side
@@ -159,6 +157,7 @@ class UI:
 
         # Game over instructions
         instructions = [
+            "R - Retry Level",
             "M - Main Menu",
             "Q - Quit Game"
         ]
@@ -190,6 +189,7 @@ class UI:
 
         # Victory instructions
         instructions = [
+            "R - Retry Level",
             "M - Main Menu", 
             "Q - Quit Game"
         ]
@@ -1,10 +1,31 @@
 #!/usr/bin/env python3
 import os
 from pathlib import Path
-from pydub import AudioSegment
 import argparse
 import concurrent.futures
+import hashlib
+import json
+import subprocess
 import time
+import wave
+
+try:
+    from pydub import AudioSegment
+except ImportError:
+    AudioSegment = None  # Only needed for conversion; build_assets.py imports file_hash
+
+# Name of the file, kept in the output directory, that records converted inputs
+MANIFEST_NAME = "wav2ogg_manifest.json"
+
+# Default memory ceiling, in bytes, for the audio buffered by one streaming conversion
+STREAM_MEMORY_LIMIT = 4 * 1024 * 1024
+
+# Encoder settings of both conversion paths; pydub picks libvorbis for "ogg" itself
+OGG_CODEC = "libvorbis"
+OGG_BITRATE = "128k"
+
+# ffmpeg raw PCM formats for each WAV sample width in bytes
+SAMPLE_FORMATS = {1: "u8", 2: "s16le", 3: "s24le", 4: "s32le"}
 
 def convert_wav_to_ogg(wav_path, output_dir=None, delete_original=False):
     """
@@ -28,11 +49,11 @@ def convert_wav_to_ogg(wav_path, output_dir=None, delete_original=False):
             output_dir = wav_path.parent
 
         # Generate output path
-        ogg_path = output_dir / f"{wav_path.stem}.ogg"
+        ogg_path = ogg_path_for(wav_path, output_dir)
         
         # Load and convert the audio file
         audio = AudioSegment.from_wav(str(wav_path))
-        audio.export(str(ogg_path), format="ogg")
+        audio.export(str(ogg_path), format="ogg", bitrate=OGG_BITRATE)
         
         # Delete original if requested
         if delete_original:
@@ -45,15 +66,176 @@ def convert_wav_to_ogg(wav_path, output_dir=None, delete_original=False):
         print(f"Error converting {wav_path.name}: {str(e)}")
         return False
 
-def process_directory(input_dir, output_dir=None, delete_original=False, max_workers=None):
+def stream_wav_to_ogg(wav_path, output_dir=None, delete_original=False, max_memory=STREAM_MEMORY_LIMIT):
+    """
+    Convert a WAV file to OGG format without loading it into memory.
+    
+    The WAV is read in blocks of at most `max_memory` bytes and piped to the
+    same ffmpeg that pydub uses, so memory use does not grow with the length
+    of the recording. WAV files the `wave` module cannot read fall back to
+    convert_wav_to_ogg.
+    
+    Args:
+        wav_path (str): Path to the WAV file
+        output_dir (str, optional): Directory to save the OGG file. If None, uses same directory as WAV
+        delete_original (bool): Whether to delete the original WAV file after conversion
+        max_memory (int): Maximum number of bytes of audio held at once
+        
+    Returns:
+        bool: True if conversion was successful, False otherwise
+    """
+    try:
+        # Create Path objects
+        wav_path = Path(wav_path)
+        if output_dir:
+            output_dir = Path(output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+        else:
+            output_dir = wav_path.parent
+        ogg_path = ogg_path_for(wav_path, output_dir)
+        
+        try:
+            wav = wave.open(str(wav_path), "rb")
+        except wave.Error:
+            return convert_wav_to_ogg(wav_path, output_dir, delete_original)
+        
+        with wav:
+            frame_size = wav.getnchannels() * wav.getsampwidth()
+            block_frames = max(1, max_memory // frame_size)
+            command = [
+                AudioSegment.converter, "-y", "-loglevel", "error",
+                "-f", SAMPLE_FORMATS[wav.getsampwidth()],
+                "-ar", str(wav.getframerate()),
+                "-ac", str(wav.getnchannels()),
+                "-i", "pipe:0",
+                "-acodec", OGG_CODEC, "-b:a", OGG_BITRATE,
+                "-f", "ogg", str(ogg_path),
+            ]
+            
+            # Feed ffmpeg one block at a time
+            process = subprocess.Popen(command, stdin=subprocess.PIPE)
+            try:
+                while True:
+                    block = wav.readframes(block_frames)
+                    if not block:
+                        break
+                    process.stdin.write(block)
+            finally:
+                process.stdin.close()
+                returncode = process.wait()
+        
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg exited with code {returncode}")
+        
+        # Delete original if requested
+        if delete_original:
+            wav_path.unlink()
+            
+        print(f"Converted: {wav_path.name} -> {ogg_path.name}")
+        return True
+        
+    except Exception as e:
+        print(f"Error converting {wav_path.name}: {str(e)}")
+        return False
+
+def file_hash(path):
+    """
+    Compute the SHA-256 of a file.
+    
+    Args:
+        path (Path): File to hash
+        
+    Returns:
+        str: Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(65536), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_manifest(path):
+    """
+    Load a conversion manifest, or an empty one if it is missing or unreadable.
+    
+    Args:
+        path (Path): Manifest file
+        
+    Returns:
+        dict: Relative WAV path -> {"sha256": ..., "ogg": ...}
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(path, manifest):
+    """
+    Write a conversion manifest, replacing the old one only once it is complete.
+    
+    Args:
+        path (Path): Manifest file
+        manifest (dict): Manifest to write
+    """
+    temp_path = path.with_suffix(".tmp")
+    with open(temp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+def ogg_path_for(wav_path, output_dir=None):
+    """
+    Get the path a WAV file is converted to.
+    
+    Args:
+        wav_path (Path): Path to the WAV file
+        output_dir (str, optional): Output directory. If None, uses same directory as WAV
+        
+    Returns:
+        Path: Path of the OGG file
+    """
+    output_dir = Path(output_dir) if output_dir else wav_path.parent
+    return output_dir / f"{wav_path.stem}.ogg"
+
+def timed_convert(wav_path, output_dir=None, delete_original=False, max_memory=None):
+    """
+    Convert a WAV file in a worker process and measure it.
+    
+    Args:
+        wav_path (Path): Path to the WAV file
+        output_dir (str, optional): Directory to save the OGG file
+        delete_original (bool): Whether to delete the original WAV file after conversion
+        max_memory (int, optional): Stream the conversion with this memory ceiling in bytes.
+            If None, the whole file is loaded at once
+        
+    Returns:
+        tuple: (success, seconds taken, size of the WAV file in bytes)
+    """
+    size = wav_path.stat().st_size
+    start_time = time.perf_counter()
+    if max_memory:
+        success = stream_wav_to_ogg(wav_path, output_dir, delete_original, max_memory)
+    else:
+        success = convert_wav_to_ogg(wav_path, output_dir, delete_original)
+    return success, time.perf_counter() - start_time, size
+
+def process_directory(input_dir, output_dir=None, delete_original=False, max_workers=None,
+                      dry_run=False, force=False, max_memory=None):
     """
     Process all WAV files in a directory and its subdirectories.
     
+    Files whose contents match the hash recorded in the manifest, and whose
+    OGG still exists, are skipped. Conversions run in a process pool since
+    pydub's work is held back by the GIL in threads.
+    
     Args:
         input_dir (str): Input directory containing WAV files
         output_dir (str, optional): Output directory for OGG files
         delete_original (bool): Whether to delete original WAV files
-        max_workers (int, optional): Maximum number of worker threads
+        max_workers (int, optional): Maximum number of worker processes
+        dry_run (bool): Only report which files would be converted
+        force (bool): Convert every file, ignoring the manifest
+        max_memory (int, optional): Stream each conversion with this memory ceiling in bytes
     """
     input_dir = Path(input_dir)
     wav_files = list(input_dir.rglob("*.wav"))
@@ -63,24 +245,60 @@ def process_directory(input_dir, output_dir=None, delete_original=False, max_wor
         print("No WAV files found in the specified directory.")
         return
     
-    print(f"Found {total_files} WAV files to convert")
+    manifest_path = Path(output_dir or input_dir) / MANIFEST_NAME
+    manifest = {} if force else load_manifest(manifest_path)
+    
+    # Work out which files changed since they were last converted
+    stale = []
+    for wav_file in wav_files:
+        key = wav_file.relative_to(input_dir).as_posix()
+        digest = file_hash(wav_file)
+        entry = manifest.get(key)
+        ogg_path = ogg_path_for(wav_file, output_dir)
+        if entry and entry["sha256"] == digest and ogg_path.exists():
+            continue
+        stale.append((wav_file, key, digest, ogg_path))
+    
+    print(f"Found {total_files} WAV files, {len(stale)} to convert")
+    if dry_run:
+        for wav_file, key, digest, ogg_path in stale:
+            print(f"Would convert: {key} -> {ogg_path}")
+        return
+    if not stale:
+        return
+    
+    if output_dir:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
     start_time = time.time()
+    total_bytes = 0
     
-    # Convert files using a thread pool
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [
-            executor.submit(convert_wav_to_ogg, wav_file, output_dir, delete_original)
-            for wav_file in wav_files
-        ]
+    # Convert files using a process pool
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(timed_convert, wav_file, output_dir, delete_original, max_memory): (wav_file, key, digest, ogg_path)
+            for wav_file, key, digest, ogg_path in stale
+        }
         
-        # Wait for all conversions to complete
+        # Record each conversion as it completes
         completed = 0
         for future in concurrent.futures.as_completed(futures):
+            wav_file, key, digest, ogg_path = futures[future]
             completed += 1
-            print(f"Progress: {completed}/{total_files} files processed")
+            try:
+                success, seconds, size = future.result()
+            except Exception as e:
+                print(f"Error converting {wav_file.name}: {str(e)}")
+                continue
+            if success:
+                manifest[key] = {"sha256": digest, "ogg": ogg_path.as_posix()}
+                total_bytes += size
+            print(f"Progress: {completed}/{len(stale)} files processed "
+                  f"({wav_file.name}: {seconds:.2f} s, {size / 1e6 / max(seconds, 1e-9):.1f} MB/s)")
     
+    save_manifest(manifest_path, manifest)
     elapsed_time = time.time() - start_time
-    print(f"\nConversion completed in {elapsed_time:.2f} seconds")
+    print(f"\nConversion completed in {elapsed_time:.2f} seconds "
+          f"({total_bytes / 1e6 / max(elapsed_time, 1e-9):.1f} MB/s)")
 
 def main():
     parser = argparse.ArgumentParser(description="Convert WAV files to OGG format")
@@ -89,15 +307,29 @@ def main():
     parser.add_argument("-d", "--delete-original", action="store_true",
                       help="Delete original WAV files after conversion")
     parser.add_argument("-w", "--workers", type=int, default=None,
-                      help="Maximum number of worker threads")
+                      help="Maximum number of worker processes")
+    parser.add_argument("-n", "--dry-run", action="store_true",
+                      help="Only list the files that would be converted")
+    parser.add_argument("-f", "--force", action="store_true",
+                      help="Convert every file, even if it is unchanged")
+    parser.add_argument("-s", "--stream", action="store_true",
+                      help="Convert in fixed-size blocks instead of loading whole files")
+    parser.add_argument("-m", "--max-memory", type=float, default=STREAM_MEMORY_LIMIT / 1024 / 1024,
+                      help="Memory ceiling per worker in MB when streaming")
     
     args = parser.parse_args()
     
+    if AudioSegment is None:
+        parser.error("pydub is required to convert audio")
+    
     process_directory(
         args.input_dir,
         args.output_dir,
         args.delete_original,
-        args.workers
+        args.workers,
+        args.dry_run,
+        args.force,
+        int(args.max_memory * 1024 * 1024) if args.stream else None
     )
 
 if __name__ == "__main__":
@@ -3,12 +3,29 @@ import random
 from settings import *
 
 class RainEffect:
-    def __init__(self, game):
+    """Rain drawn over the weather phase.
+
+    In "particles" mode every drop is simulated and drawn as a line, so the
+    cost grows with the intensity. In "sheet" mode each intensity is
+    pre-rendered once into a strip of drops that wraps vertically; the
+    strip is scrolled down the screen with a few blits per frame, whatever
+    the intensity.
+    """
+    # Pre-rendered strips by intensity
+    sheets = {}
+
+    def __init__(self, game, mode=RAIN_MODE):
         self.game = game
+        self.mode = mode
         self.drops = []
         self.intensity = 0.5  # 0 to 1
+        self.offset = 0
         
     def update(self):
+        if self.mode == "sheet":
+            self.offset = (self.offset + RAIN_DROP_SPEED) % RAIN_SHEET_HEIGHT
+            return
+        
         # Add new raindrops based on intensity
         if self.game.state == WEATHER:
             drops_to_add = int(20 * self.intensity)
@@ -17,86 +34,147 @@ class RainEffect:
         
         # Update existing drops
         for drop in self.drops[:]:
-            drop[1] += 15  # Move down
+            drop[1] += RAIN_DROP_SPEED  # Move down
             if drop[1] > HEIGHT:
                 self.drops.remove(drop)
     
     def create_raindrop(self):
         return [random.randint(0, WIDTH), random.randint(-20, 0)]
     
+    @classmethod
+    def preload_sheets(cls):
+        """Pre-render the strip of every rain intensity level"""
+        for intensity in RAIN_INTENSITY_LEVELS.values():
+            cls.get_sheet(intensity)
+
+    @classmethod
+    def get_sheet(cls, intensity):
+        """Strip of drops with the particle path's steady-state density for an intensity"""
+        sheet = cls.sheets.get(intensity)
+        if sheet is None:
+            sheet = cls.sheets[intensity] = cls.render_sheet(intensity)
+        return sheet
+
+    @staticmethod
+    def render_sheet(intensity):
+        # Particles live for the frames they take to fall through the screen
+        lifetime = (HEIGHT + 20) / RAIN_DROP_SPEED
+        count = int(int(20 * intensity) * lifetime * RAIN_SHEET_HEIGHT / HEIGHT)
+        sheet = pg.Surface((WIDTH, RAIN_SHEET_HEIGHT))
+        sheet.fill(BLACK)
+        for _ in range(count):
+            x = random.randint(0, WIDTH)
+            y = random.randrange(RAIN_SHEET_HEIGHT)
+            # Drops crossing the bottom edge continue at the top, so strips tile seamlessly
+            for top in (y, y - RAIN_SHEET_HEIGHT):
+                pg.draw.line(sheet, RAIN_COLOR, (x, top), (x, top + 5), 1)
+        if pg.display.get_surface():
+            sheet = sheet.convert()
+        sheet.set_colorkey(BLACK, pg.RLEACCEL)
+        return sheet
+
     def draw(self, surface):
         if self.game.state == WEATHER:
+            if self.mode == "sheet":
+                sheet = self.get_sheet(self.intensity)
+                for y in range(self.offset - RAIN_SHEET_HEIGHT, HEIGHT, RAIN_SHEET_HEIGHT):
+                    surface.blit(sheet, (0, y))
+                return
             for drop in self.drops:
-                pg.draw.line(surface, (200, 200, 255), 
+                pg.draw.line(surface, RAIN_COLOR, 
                            (drop[0], drop[1]), 
                            (drop[0], drop[1] + 5), 1)
 
 class WaterOverlay:
+    # Rendered overlays by (height, alpha) and warnings by alpha, at cache_size
+    # tile pixels; both are cleared when the zoom changes the tile size
+    water_cache = {}
+    warning_cache = {}
+    cache_size = None
+
     def __init__(self, game):
         self.game = game
         self.warning_alpha = 0
         self.warning_increasing = True
+        self.flash_speed = WARNING_FLASH_SPEED
+        self.depth_alpha = True  # Otherwise every overlay uses WATER_OPACITY
         
     def update(self):
-        # Pulse warning alpha for high water levels
-        if self.warning_increasing:
-            self.warning_alpha += 4
+        # Pulse warning alpha for high water levels; a speed of 0 holds it steady
+        if not self.flash_speed:
+            self.warning_alpha = max(self.warning_alpha, 100)  # Still visible if held before pulsing
+        elif self.warning_increasing:
+            self.warning_alpha += self.flash_speed
             if self.warning_alpha >= 255:
                 self.warning_increasing = False
         else:
-            self.warning_alpha -= 4
+            self.warning_alpha -= self.flash_speed
             if self.warning_alpha <= 100:
                 self.warning_increasing = True
     
-    def draw_water_level(self, tile, surface):
+    def draw_water_level(self, tile, surface, rect):
+        """Draw the tile's water level into its screen rectangle."""
         if tile.water_level > 0:
-            # Draw water level
-            water_height = int(TILESIZE * tile.water_level)
-            water_rect = pg.Rect(
-                tile.rect.x,
-                tile.rect.bottom - water_height,
-                TILESIZE,
-                water_height
-            )
-            
             # Water color based on depth
-            base_color = WATER_BLUE
-            alpha = int(255 * tile.water_level)
-            water_surface = pg.Surface((TILESIZE, water_height), pg.SRCALPHA)
-            water_color = (*base_color, alpha)  # Create RGBA tuple
-            pg.draw.rect(water_surface, water_color, 
-                        (0, 0, TILESIZE, water_height))
-            surface.blit(water_surface, water_rect)
+            tile_size = rect.width
+            if tile_size != WaterOverlay.cache_size:
+                WaterOverlay.water_cache.clear()
+                WaterOverlay.warning_cache.clear()
+                WaterOverlay.cache_size = tile_size
+            water_height = int(tile_size * tile.water_level)
+            alpha = int(255 * tile.water_level) if self.depth_alpha else WATER_OPACITY
+            key = (water_height, alpha)
+            water_surface = WaterOverlay.water_cache.get(key)
+            if water_surface is None:
+                water_surface = pg.Surface((tile_size, water_height), pg.SRCALPHA)
+                water_surface.fill((*WATER_BLUE, alpha))
+                WaterOverlay.water_cache[key] = water_surface
+            surface.blit(water_surface, (rect.x, rect.bottom - water_height))
             
             # Warning indicator for high water
             if tile.water_level > FLOOD_THRESHOLD:
-                warning_surface = pg.Surface((TILESIZE, TILESIZE), pg.SRCALPHA)
-                warning_color = (255, 0, 0, min(255, self.warning_alpha))  # Ensure alpha doesn't exceed 255
-                pg.draw.rect(warning_surface, warning_color, 
-                            warning_surface.get_rect())
-                surface.blit(warning_surface, tile.rect)
+                warning_alpha = min(255, self.warning_alpha)  # Ensure alpha doesn't exceed 255
+                warning_surface = WaterOverlay.warning_cache.get(warning_alpha)
+                if warning_surface is None:
+                    warning_surface = pg.Surface((tile_size, tile_size), pg.SRCALPHA)
+                    warning_surface.fill((255, 0, 0, warning_alpha))
+                    WaterOverlay.warning_cache[warning_alpha] = warning_surface
+                surface.blit(warning_surface, rect)
 
 class InfrastructureIndicator:
+    # Rendered health bars by (durability bucket, barrier tree), at cache_width pixels
+    bar_cache = {}
+    cache_width = None
+
     def __init__(self, infrastructure):
         self.infrastructure = infrastructure
         self.health_bar_height = 3
         
-    def draw(self, surface):
+    def draw(self, surface, rect, barrier_tree=False):
+        """Draw the health bar above the infrastructure's screen rectangle."""
+        if rect.width != InfrastructureIndicator.cache_width:
+            InfrastructureIndicator.bar_cache.clear()  # Zoom changed; old widths are not drawn again soon
+            InfrastructureIndicator.cache_width = rect.width
+        key = (self.infrastructure.bucket, barrier_tree)
+        bar = InfrastructureIndicator.bar_cache.get(key)
+        if bar is None:
+            bar = self.render_bar(rect.width, *key)
+            InfrastructureIndicator.bar_cache[key] = bar
+        surface.blit(bar, (rect.x, rect.y - 5))
+
+    def render_bar(self, width, bucket, barrier_tree):
+        """Render a health bar for a durability bucket."""
         # Draw health bar background
-        health_rect = pg.Rect(
-            self.infrastructure.rect.x,
-            self.infrastructure.rect.y - 5,
-            TILESIZE,
-            self.health_bar_height
-        )
-        pg.draw.rect(surface, (255, 0, 0), health_rect)
+        bar = pg.Surface((width, self.health_bar_height))
+        bar.fill((255, 0, 0))
         
-        # Draw current health
-        current_health = int(TILESIZE * (self.infrastructure.durability / 100))
+        # Draw current health; trees acting as barriers are shown in gray
+        health = 100 * bucket / DURABILITY_BUCKETS
+        current_health = int(width * health / 100)
         if current_health > 0:
-            health_rect.width = current_health
-            color = self.get_health_color(self.infrastructure.durability)
-            pg.draw.rect(surface, color, health_rect)
+            color = GRAY if barrier_tree else self.get_health_color(health)
+            bar.fill(color, (0, 0, current_health, self.health_bar_height))
+        return bar
     
     def get_health_color(self, health):
         if health > 70:
@@ -124,10 +202,3 @@ def update_tile_appearance(tile):
     if tile.has_infrastructure:
         pg.draw.rect(tile.image, (100, 100, 100), 
                     tile.image.get_rect().inflate(-4, -4), 2)
-    
-    # Add highlight if selected
-    if tile.highlighted:
-        highlight_surface = pg.Surface(tile.image.get_size(), pg.SRCALPHA)
-        pg.draw.rect(highlight_surface, (255, 255, 255, 100), 
-                    highlight_surface.get_rect())
-        tile.image.blit(highlight_surface, (0, 0))
\ No newline at end of file